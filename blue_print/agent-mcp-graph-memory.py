@@ -1,5 +1,4 @@
 import boto3
-import re
 import logging
 
 from mcp.client.streamable_http import streamablehttp_client
@@ -115,11 +114,27 @@ streamable_http_mcp_code = MCPClient(create_streamable_http_mcp_code)
 # Clean the final response
 def strip_thinking(text: str) -> str:
     """
-    Remove all <thinking>...</thinking> blocks from the response.
+    Remove all <thinking>...</thinking> blocks from the response, one pass over the text.
+    Standalone copy of multi_agent/thinking_filter.strip_thinking (same result, an unclosed block is dropped).
     """
     logger.info("strip_thinking(text: str)")
-    
-    return re.sub(r"<thinking>.*?</thinking>", "", text, flags=re.DOTALL).strip()
+
+    output = []
+    start = 0
+    inside = False
+    while True:
+        tag = "</thinking>" if inside else "<thinking>"
+        index = text.find(tag, start)
+        if index < 0:
+            break
+        if not inside:
+            output.append(text[start:index])
+        start = index + len(tag)
+        inside = not inside
+
+    if not inside:
+        output.append(text[start:])
+    return "".join(output).strip()
 
 # Choose how to handle the memory
 def determine_action_memory(query):
@@ -1,14 +1,18 @@
 import logging
-import boto3
 import time
-import json
 
-from main_memory import main_memory
+from request_context import get_token
+from tool_catalog import get_tool_catalog
+from agent_pool import SubAgentPool
+from stream_events import forward_stream
+from direct_execution import direct_call
+from agent_metrics import MetricsHook
+from prompt_cache import cached_system_prompt
+from tool_results import mcp_payloads, structured_result, text_result
+from model_registry import get_model, agent_tier, invoke_with_escalation, answered_with_tools, ModelBreakerHook
+from intent_router import query_tier
 
 from strands import Agent, tool
-from strands.models import BedrockModel
-from mcp.client.streamable_http import streamablehttp_client
-from strands.tools.mcp.mcp_client import MCPClient
 
 from strands.hooks import (HookProvider, 
                            HookRegistry, 
@@ -61,32 +65,18 @@ ACCOUNT_SYSTEM_PROMPT = """
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Setup a model
-#model_id = lite pro premier
-model_id = "arn:aws:bedrock:us-east-2:908671954593:inference-profile/us.amazon.nova-pro-v1:0"  
-
 logger.info('\033[1;33m Starting the Account Agent... \033[0m')
-logger.info(f'\033[1;33m model_id: {model_id} \033[0m \n')
-
-# Create boto3 session
-session = boto3.Session(
-    region_name='us-east-2',
-)
 
-# Create Bedrock model
-bedrock_model = BedrockModel(
-        model_id=model_id,
-        temperature=0.0,
-        boto_session=session,
-)
+# default model tier, simple requests run on a cheaper one (see model_registry)
+ACCOUNT_TIER = agent_tier("account")
 
-# load mcp servers
-mcp_url = "http://127.0.0.1:9002/mcp"
+# cached tools bound to the shared pool of warm mcp sessions
+tool_catalog = get_tool_catalog()
 
-def create_streamable_http_mcp_server(mcp_url: str):
-    return streamablehttp_client(mcp_url)
-
-streamable_http_mcp_server = MCPClient(lambda: create_streamable_http_mcp_server(mcp_url))
+ACCOUNT_TOOLS = ["account_healthy",
+                 "get_account",
+                 "create_account",
+                 "get_account_from_person"]
 
 class ToolValidationError(Exception):
     """Custom exception to abort tool calls immediately."""
@@ -98,7 +88,6 @@ class AgentHook(HookProvider):
     def __init__(self):
         self.start_agent = ""
         self.tool_name = "unknown"
-        self.metrics = {}
 
     # Register hooks
     def register_hooks(self, registry: HookRegistry) -> None:
@@ -119,15 +108,6 @@ class AgentHook(HookProvider):
 
         duration = time.time() - self.start_agent
         logger.info(f"Request completed - Agent: {event.agent.name} - Duration: {duration:.2f}s")
-        
-        self.metrics["total_requests"] = self.metrics.get("total_requests", 0) + 1
-        self.metrics["avg_duration"] = (
-            self.metrics.get("avg_duration", 0) * 0.9 + duration * 0.1 # Exponencial Moving Average 
-        )
-
-        logger.info(f" *** *** self.metrics *** *** ")
-        logger.info(f" {self.metrics}")
-        logger.info(f" *** *** self.metrics *** *** ")
 
     def before_tool(self, event: BeforeToolCallEvent) -> None:
         logger.info(f"*** Tool invocation - agent: {event.agent.name} : { event.tool_use.get('name') } *** ")
@@ -138,85 +118,77 @@ class AgentHook(HookProvider):
         self.tool_name = event.tool_use.get("name")
         logger.info(f"* Tool completed - agent: {event.agent.name} : {self.tool_name}")
 
+def build_account_agent(streamable_http_mcp_server) -> Agent:
+    """
+    Build the ACCOUNT agent once, its tools are bound to the given pooled mcp session.
+    """
+    selected_tools = tool_catalog.select(streamable_http_mcp_server, ACCOUNT_TOOLS)
+
+    logger.info(f"Available MCP tools: {[tool.tool_name for tool in selected_tools]}")
+
+    return Agent(name="main",
+                system_prompt=cached_system_prompt(ACCOUNT_SYSTEM_PROMPT),
+                model=get_model(ACCOUNT_TIER),
+                tools=selected_tools,
+                hooks=[AgentHook(), MetricsHook("account"), ModelBreakerHook()],
+                retry_strategy=None,
+                callback_handler=forward_stream("account")
+            )
+
+account_agent_pool = SubAgentPool("account", build_account_agent, tool_catalog)
+
 @tool
-def account_agent(query: str) -> str:
+def account_agent(query: str = "", operation: str = None, arguments: dict = None, fields: list = None) -> dict:
     """
     Process and respond all ACCOUNT queries using a specialized ACCOUNT agent.
     
     Args:
         query: Given account, create account, get account informations and details, and check account healthy status.
+        operation: Optional typed mode, one of account_healthy, get_account, create_account or get_account_from_person. Given with its arguments the MCP tool is called directly, without the ACCOUNT agent, use it whenever the request maps to exactly one operation with all its arguments.
+        arguments: Arguments of the operation, e.g. {"account": "ACC-302.201", "person": "P-302.201"} for create_account, {"account": "ACC-302.201"} for get_account, {"person": "P-302.201"} for get_account_from_person.
+        fields: Optional payload fields the answer needs, e.g. ["account_id", "person_id"], everything else is left out.
         
     Returns:
         an account with all details.
     """
     logger.info("function => account_agent")
    
-    token = main_memory.get_token()
+    token = get_token()
     if not token:
         logger.error("Error, I couldn't process No JWT token available")
-        return "Error, I couldn't process No JWT token available"
+        return text_result("Error, I couldn't process No JWT token available", "error")
 
-    context={
-        "jwt":token
-    }
+    # typed mode: one MCP call with the structured arguments, no LLM hop
+    if operation:
+        return direct_call("account", operation, arguments, ACCOUNT_TOOLS, fields)
 
     try:
         logger.info("Routed to Account Agent")
 
-        agent_hook = AgentHook()
-
         # Format the query for the agent
-        formatted_query = f"Please process the following query: {query} with context: {context} and extract structured information"
-        all_tools = []
+        formatted_query = f"Please process the following query: {query} and extract structured information"
          
-        with streamable_http_mcp_server:
-            all_tools.extend(streamable_http_mcp_server.list_tools_sync())
-
-            selected_tools = [
-                t for t in all_tools 
-                if t.tool_name in ["account_healthy", 
-                                   "get_account",
-                                   "create_account", 
-                                   "get_account_from_person"]
-            ]
-
-            logger.info(f"Available MCP tools: {[tool.tool_name for tool in selected_tools]}")
-
-            # Create the account agent
-            agent = Agent(name="main",
-                        system_prompt=ACCOUNT_SYSTEM_PROMPT,
-                        model=bedrock_model, 
-                        tools=selected_tools,
-                        hooks=[agent_hook],
-                        callback_handler=None
-                    )
-            
+        with account_agent_pool.agent() as agent:
             try:
-                agent_response = agent(formatted_query)
+                agent_response = invoke_with_escalation(agent, formatted_query, query_tier(query, ACCOUNT_TIER),
+                                                        answered_with_tools,
+                                                        fatal=(ToolValidationError,))
                 text_response = str(agent_response)
 
-                # Clean the message
+                # the MCP payloads themselves, not the agent's prose rendition of them
+                payloads = mcp_payloads(agent.messages, ACCOUNT_TOOLS)
+                if payloads:
+                    return structured_result(payloads, fields)
+
                 if len(text_response) > 0:
-                    return json.dumps({
-                                "status": "success",
-                                "response": text_response
-                            })
+                    return text_result(text_response)
                 
-                return json.dumps({
-                    "status": "error",
-                    "reason": "Error but I couldn't process this request due a problem. Please check if your query is clearly stated or try rephrasing it."
-                })  
+                return text_result("Error but I couldn't process this request due a problem. Please check if your query is clearly stated or try rephrasing it.", "error")  
                 
             except ToolValidationError as e:
                 logger.error(f"Transaction aborted: {e}")
-                return json.dumps({
-                    "status": "error",
-                    "reason": f"Transaction aborted: {str(e)}"
-                })
+                return text_result(f"Transaction aborted: {str(e)}", "error")
            
     except Exception as e:
         logger.error(f"Error processing your query: {str(e)}")
-        return json.dumps({
-            "status": "error",
-            "reason": f"Error processing your query: {str(e)}"
-        })
\ No newline at end of file
+        return text_result(f"Error processing your query: {str(e)}", "error")
\ No newline at end of file
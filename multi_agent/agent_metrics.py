@@ -0,0 +1,97 @@
+import time
+import logging
+
+from opentelemetry import metrics
+from strands.hooks import (HookProvider,
+                           HookRegistry,
+                           AfterInvocationEvent,
+                           AfterToolCallEvent,
+                           BeforeInvocationEvent)
+
+from model_registry import token_usage
+from prompt_cache import cache_usage
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+METER_NAME = "py-payment-agent"
+
+class AgentMetrics:
+    """
+    Process wide agent and tool metrics, exported through the OTel meter provider
+    (StrandsTelemetry.setup_meter). Instruments created before the provider is set are proxies
+    bound to it once it is.
+    """
+
+    def __init__(self, meter_name: str = METER_NAME):
+        meter = metrics.get_meter(meter_name)
+        self.invocation_duration = meter.create_histogram(
+            "agent.invocation.duration", unit="s", description="Duration of an agent invocation")
+        self.invocation_errors = meter.create_counter(
+            "agent.invocation.errors", description="Agent invocations that ended without a result")
+        self.tool_duration = meter.create_histogram(
+            "agent.tool.duration", unit="s", description="Duration of a tool call made by an agent")
+        self.tool_calls = meter.create_counter(
+            "agent.tool.calls", description="Tool calls made by an agent")
+        self.tool_errors = meter.create_counter(
+            "agent.tool.errors", description="Tool calls that raised or returned an error status")
+        self.tokens = meter.create_counter(
+            "agent.tokens", unit="{token}", description="Model tokens used by an agent, prompt cache reads and writes included")
+
+    def record_invocation(self, agent_name: str, model_id: str, duration: float, tokens: dict,
+                          failed: bool = False) -> None:
+        """
+        tokens by type: input, output, cache_read and cache_write.
+        """
+        attributes = {"agent": agent_name}
+        self.invocation_duration.record(duration, attributes)
+        if failed:
+            self.invocation_errors.add(1, attributes)
+        for token_type, count in tokens.items():
+            self.tokens.add(count, {**attributes, "model": model_id, "type": token_type})
+
+    def record_tool(self, agent_name: str, tool_name: str, duration: float, failed: bool = False) -> None:
+        attributes = {"agent": agent_name, "tool": tool_name}
+        self.tool_calls.add(1, attributes)
+        self.tool_duration.record(duration, attributes)
+        if failed:
+            self.tool_errors.add(1, attributes)
+
+class MetricsHook(HookProvider):
+    """
+    Feeds agent_metrics from the hooks of one agent. An agent runs one invocation at a time,
+    its tools may run concurrently.
+    """
+
+    def __init__(self, agent_name: str):
+        self.agent_name = agent_name
+        self._started = 0.0
+        self._usage = (0, 0, 0, 0)
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(BeforeInvocationEvent, self.agent_start)
+        registry.add_callback(AfterInvocationEvent, self.agent_end)
+        registry.add_callback(AfterToolCallEvent, self.after_tool)
+
+    def agent_start(self, event: BeforeInvocationEvent) -> None:
+        self._started = time.perf_counter()
+        self._usage = token_usage(event.agent) + cache_usage(event.agent)
+
+    def agent_end(self, event: AfterInvocationEvent) -> None:
+        usage = token_usage(event.agent) + cache_usage(event.agent)
+        # the pool resets the metrics between checkouts
+        tokens = {token_type: max(0, after - before) for token_type, after, before
+                    in zip(("input", "output", "cache_read", "cache_write"), usage, self._usage)}
+        agent_metrics.record_invocation(self.agent_name,
+                                        event.agent.model.get_config().get("model_id", "unknown"),
+                                        time.perf_counter() - self._started,
+                                        tokens,
+                                        failed=event.result is None)
+
+    def after_tool(self, event: AfterToolCallEvent) -> None:
+        failed = event.exception is not None or (event.result or {}).get("status") == "error"
+        agent_metrics.record_tool(self.agent_name, event.tool_use.get("name"), event.duration or 0.0, failed)
+
+# global instance
+agent_metrics = AgentMetrics()
@@ -0,0 +1,89 @@
+import os
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+
+from strands.agent.state import AgentState
+from strands.telemetry.metrics import EventLoopMetrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+AGENT_POOL_SIZE = int(os.getenv("AGENT_POOL_SIZE", "4"))
+AGENT_POOL_TIMEOUT = float(os.getenv("AGENT_POOL_TIMEOUT", "60"))
+
+class AgentPoolExhausted(Exception):
+    """Raised when no sub-agent instance could be checked out in time."""
+    pass
+
+class PooledAgent:
+    """
+    A pre-built sub-agent pinned to the MCP session its tools are bound to.
+    """
+
+    def __init__(self, agent, client, catalog_version: int):
+        self.agent = agent
+        self.client = client
+        self.catalog_version = catalog_version
+
+class SubAgentPool:
+    """
+    Pre-built instances of one specialist agent.
+    System prompt, model, tools and hooks are built once, only the conversation state is reset between queries.
+    """
+
+    def __init__(self, name: str, factory, tool_catalog, size: int = AGENT_POOL_SIZE, timeout: float = AGENT_POOL_TIMEOUT):
+        self.name = name
+        self.factory = factory
+        self.tool_catalog = tool_catalog
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max(1, size))
+
+    def _build(self, client) -> PooledAgent:
+        logger.info(f"Building {self.name} sub-agent instance")
+        self.tool_catalog.ensure_fresh(client)
+        return PooledAgent(self.factory(client), client, self.tool_catalog.version)
+
+    def _reset(self, pooled: PooledAgent) -> None:
+        pooled.agent.messages = []
+        pooled.agent.state = AgentState()
+        pooled.agent.event_loop_metrics = EventLoopMetrics()
+
+    @contextmanager
+    def agent(self):
+        """
+        Check out an agent for exclusive use, blocks up to timeout when every instance is busy.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise AgentPoolExhausted(f"no {self.name} agent available after {self.timeout}s")
+
+        pooled = None
+        try:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                pooled = None
+
+            if pooled is None:
+                with self.tool_catalog.mcp_pool.connection() as client:
+                    pooled = self._build(client)
+                    yield pooled.agent
+            else:
+                with self.tool_catalog.mcp_pool.connection(pooled.client) as client:
+                    self.tool_catalog.ensure_fresh(client)
+                    # rebuilt when the catalog changed or the session it was bound to was replaced
+                    if pooled.catalog_version != self.tool_catalog.version or client is not pooled.client:
+                        pooled = self._build(client)
+                    yield pooled.agent
+        except Exception:
+            # do not recycle an instance left in an unknown state
+            pooled = None
+            raise
+        finally:
+            if pooled is not None:
+                self._reset(pooled)
+                self._idle.put(pooled)
+            self._slots.release()
@@ -0,0 +1,58 @@
+import os
+import asyncio
+import logging
+
+from tool_catalog import get_tool_catalog, tool_result_payload
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_PARALLEL = int(os.getenv("BATCH_MAX_PARALLEL", "8"))
+
+class BatchLookup:
+    """
+    Runs several idempotent MCP reads concurrently with bounded parallelism,
+    so latency follows the slowest lookup instead of the number of ids.
+    """
+
+    def __init__(self, tool_catalog, max_parallel: int = BATCH_MAX_PARALLEL):
+        self.tool_catalog = tool_catalog
+        self.max_parallel = max(1, max_parallel)
+
+    async def _lookup(self, semaphore, tool_name: str, arguments: dict, token: str) -> dict:
+        async with semaphore:
+            try:
+                result = await asyncio.to_thread(self.tool_catalog.call_tool, tool_name, arguments, token)
+                return {
+                    "tool": tool_name,
+                    "arguments": arguments,
+                    "status": result.get("status"),
+                    "data": tool_result_payload(result),
+                }
+            except Exception as e:
+                logger.error(f"Batch lookup {tool_name} {arguments} failed. Reason: {e}")
+                return {
+                    "tool": tool_name,
+                    "arguments": arguments,
+                    "status": "error",
+                    "reason": str(e),
+                }
+
+    async def run_async(self, calls: list, token: str) -> dict:
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        results = await asyncio.gather(*(self._lookup(semaphore, tool_name, arguments, token)
+                                         for tool_name, arguments in calls))
+
+        failed = sum(1 for r in results if r["status"] != "success")
+        return {
+            "status": "success" if failed == 0 else ("error" if failed == len(results) else "partial"),
+            "results": list(results),
+        }
+
+    def run(self, calls: list, token: str) -> dict:
+        logger.info(f"Batch lookup of {len(calls)} ids, max_parallel: {self.max_parallel}")
+        return asyncio.run(self.run_async(calls, token))
+
+# global instance
+batch_lookup = BatchLookup(get_tool_catalog())
@@ -0,0 +1,162 @@
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from corpus import README, load_corpus
+from request_context import request_scope
+from mcp_pool import MCP_URL, get_mcp_pool
+from tool_catalog import get_tool_catalog
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BENCHMARK_CONCURRENCY = int(os.getenv("BENCHMARK_CONCURRENCY", "4"))
+BENCHMARK_REPEAT = int(os.getenv("BENCHMARK_REPEAT", "1"))
+# comma separated, empty runs every category
+BENCHMARK_CATEGORIES = [c.strip().upper() for c in os.getenv("BENCHMARK_CATEGORIES", "").split(",") if c.strip()]
+BENCHMARK_OUTPUT = os.getenv("BENCHMARK_OUTPUT", "benchmark_results.json")
+# a previous BENCHMARK_OUTPUT, p95 and tokens are compared against it
+BENCHMARK_BASELINE = os.getenv("BENCHMARK_BASELINE")
+BENCHMARK_TOKEN = os.getenv("BENCHMARK_TOKEN", os.getenv("JWT", "benchmark"))
+
+COUNTERS = ["llm_calls", "mcp_calls", "mcp_cache_hits", "input_tokens", "output_tokens",
+            "cache_read_tokens", "cache_write_tokens"]
+
+def percentile(values: list, p: float) -> float:
+    """
+    Nearest rank percentile.
+    """
+    if not values:
+        return 0.0
+    values = sorted(values)
+    rank = max(1, -(-len(values) * p // 100))
+    return values[int(rank) - 1]
+
+async def run_query(category: str, query: str, token: str) -> dict:
+    """
+    One request in a fresh conversation, with what it cost.
+    """
+    # imported once main() configured the session store
+    from main_agent import create_main_agent, process_request_async
+
+    session_id = f"benchmark-{uuid.uuid4().hex[:8]}"
+    agent, _ = create_main_agent(session_id)
+
+    record = {"category": category, "query": query, "status": "success"}
+    started = time.perf_counter()
+    with request_scope(token, session_id) as context:
+        try:
+            record["answer"] = (await process_request_async(agent, query, token))[:200]
+        except Exception as e:
+            logger.error(f"Benchmark query failed: {query}. Reason: {e}")
+            record["status"] = "error"
+            record["error"] = str(e)
+        record["latency"] = round(time.perf_counter() - started, 4)
+        record.update({counter: context.usage.get(counter, 0) for counter in COUNTERS})
+
+    record["fast_path"] = record["llm_calls"] == 0
+    return record
+
+async def run(corpus: list, concurrency: int, repeat: int, token: str) -> list:
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def bounded(category: str, query: str) -> dict:
+        async with semaphore:
+            return await run_query(category, query, token)
+
+    return await asyncio.gather(*(bounded(category, query)
+                                  for _ in range(repeat) for category, query in corpus))
+
+def summarize(records: list) -> dict:
+    """
+    Latency percentiles and per request averages of the counters, by category and overall.
+    """
+    groups = {"ALL": records}
+    for record in records:
+        groups.setdefault(record["category"], []).append(record)
+
+    summary = {}
+    for name, group in groups.items():
+        latencies = [r["latency"] for r in group]
+        summary[name] = {
+            "requests": len(group),
+            "errors": sum(1 for r in group if r["status"] != "success"),
+            "fast_path": sum(1 for r in group if r["fast_path"]),
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            **{counter: round(sum(r[counter] for r in group) / len(group), 2) for counter in COUNTERS},
+        }
+    return summary
+
+def print_summary(summary: dict, baseline: dict = None) -> None:
+    print(f"\n{'category':<15} {'req':>4} {'err':>4} {'fast':>4} {'p50':>7} {'p95':>7} {'p99':>7} "
+          f"{'llm':>5} {'mcp':>5} {'cache':>5} {'in_tok':>8} {'out_tok':>8} {'cache_rd':>8}")
+    for name, s in summary.items():
+        line = (f"{name:<15} {s['requests']:>4} {s['errors']:>4} {s['fast_path']:>4} {s['p50']:>7.3f} {s['p95']:>7.3f} "
+                f"{s['p99']:>7.3f} {s['llm_calls']:>5} {s['mcp_calls']:>5} {s['mcp_cache_hits']:>5} "
+                f"{s['input_tokens']:>8} {s['output_tokens']:>8} {s['cache_read_tokens']:>8}")
+        previous = (baseline or {}).get(name)
+        if previous:
+            line += (f"  | p95 {delta(s['p95'], previous['p95'])}"
+                     f" tokens {delta(s['input_tokens'] + s['output_tokens'], previous['input_tokens'] + previous['output_tokens'])}")
+        print(line)
+
+def delta(current: float, previous: float) -> str:
+    if not previous:
+        return "n/a"
+    return f"{(current - previous) / previous * 100:+.1f}%"
+
+def main() -> None:
+    # benchmark conversations are throw away, keep them out of the session files (read when session_store is imported)
+    os.environ.setdefault("SESSION_STORE", "memory")
+    os.environ.setdefault("SESSION_ID", "benchmark")
+    from model_registry import MODEL_PROVIDER
+
+    corpus = [(c, q) for c, q in load_corpus() if not BENCHMARK_CATEGORIES or c in BENCHMARK_CATEGORIES]
+    if not corpus:
+        sys.exit(f"No queries found in {README} for {BENCHMARK_CATEGORIES}")
+
+    logger.info(f'\033[1;33m Benchmark: {len(corpus)} queries x {BENCHMARK_REPEAT}, concurrency {BENCHMARK_CONCURRENCY} \033[0m')
+
+    get_mcp_pool().start()
+    get_tool_catalog().prefetch()
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    wall = time.perf_counter()
+    records = asyncio.run(run(corpus, BENCHMARK_CONCURRENCY, BENCHMARK_REPEAT, BENCHMARK_TOKEN))
+    wall = time.perf_counter() - wall
+
+    summary = summarize(records)
+    baseline = None
+    if BENCHMARK_BASELINE:
+        with open(BENCHMARK_BASELINE) as f:
+            baseline = json.load(f)["summary"]
+    print_summary(summary, baseline)
+    print(f"\n{len(records)} requests in {wall:.2f}s, {len(records) / wall:.2f} req/s")
+
+    with open(BENCHMARK_OUTPUT, "w") as f:
+        json.dump({
+            "started_at": started_at,
+            "config": {
+                "concurrency": BENCHMARK_CONCURRENCY,
+                "repeat": BENCHMARK_REPEAT,
+                "categories": BENCHMARK_CATEGORIES,
+                "model_provider": MODEL_PROVIDER,
+                "mcp_url": MCP_URL,
+            },
+            "wall_time": round(wall, 3),
+            "summary": summary,
+            "requests": records,
+        }, f, indent=2, ensure_ascii=False)
+    logger.info(f"Benchmark results saved to {BENCHMARK_OUTPUT}")
+
+# Replay the README sample queries, e.g. offline with mock_mcp_server.py and MODEL_PROVIDER=fake
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import os
+import time
+import random
+import logging
+import threading
+
+from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# consecutive failures that open a circuit
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+# seconds a circuit stays open before a half-open probe, doubled up to BREAKER_MAX_OPEN_TIME while probes fail
+BREAKER_OPEN_TIME = float(os.getenv("BREAKER_OPEN_TIME", "10"))
+BREAKER_MAX_OPEN_TIME = float(os.getenv("BREAKER_MAX_OPEN_TIME", "120"))
+# calls let through while half-open
+BREAKER_HALF_OPEN_CALLS = int(os.getenv("BREAKER_HALF_OPEN_CALLS", "1"))
+# exponential backoff with full jitter between retries, seconds
+BACKOFF_BASE = float(os.getenv("BACKOFF_BASE", "1"))
+BACKOFF_MAX = float(os.getenv("BACKOFF_MAX", "20"))
+
+METER_NAME = "py-payment-agent"
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+# circuit_breaker.state gauge values
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    """
+    Full jitter: uniform between 0 and base * 2^attempt, capped. Callers retrying together spread out.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"{name} is unavailable (circuit open), retry after {retry_after:.0f}s. Do not retry this request now.")
+
+class CircuitBreaker:
+    """
+    Circuit of one dependency (a Bedrock model, an MCP endpoint, the OAuth endpoint).
+    Closed until failure_threshold consecutive failures, then open: calls fail fast until the open time passed.
+    Half-open lets half_open_calls probes through, a success closes it, a failure opens it again for twice as long.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, open_time: float = BREAKER_OPEN_TIME,
+                 max_open_time: float = BREAKER_MAX_OPEN_TIME, half_open_calls: int = BREAKER_HALF_OPEN_CALLS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_time = open_time
+        self.max_open_time = max_open_time
+        self.half_open_calls = max(1, half_open_calls)
+        self.state = CLOSED
+        self.failures = 0
+        self.opens = 0
+        self.opened_at = 0.0
+        self.open_for = 0.0
+        self.probes = 0
+        self.probe_started = 0.0
+        self.rejections = 0
+        self._lock = threading.Lock()
+
+    def _remaining(self) -> float:
+        return max(0.0, self.opened_at + self.open_for - time.time())
+
+    def retry_after(self) -> float:
+        with self._lock:
+            return self._remaining() if self.state == OPEN else 0.0
+
+    def _reject(self, retry_after: float):
+        self.rejections += 1
+        circuit_breakers.rejections.add(1, {"dependency": self.name})
+        return CircuitOpenError(self.name, retry_after)
+
+    def check(self) -> None:
+        """
+        Fail fast while open, without taking a half-open probe (e.g. before borrowing a connection).
+        """
+        with self._lock:
+            if self.state == OPEN and self._remaining() > 0:
+                raise self._reject(self._remaining())
+
+    def allow(self) -> None:
+        """
+        Admit a call or raise CircuitOpenError. An admitted call must end in success() or failure().
+        """
+        with self._lock:
+            if self.state == OPEN:
+                if self._remaining() > 0:
+                    raise self._reject(self._remaining())
+                self._transition(HALF_OPEN)
+                self.probes = 0
+
+            if self.state == HALF_OPEN:
+                # a probe that never reported back (cancelled) frees its slot after open_time
+                if self.probes >= self.half_open_calls and time.time() - self.probe_started < self.open_time:
+                    raise self._reject(self.open_time)
+                if self.probes >= self.half_open_calls:
+                    self.probes = 0
+                self.probes += 1
+                self.probe_started = time.time()
+
+    def success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            if self.state != CLOSED:
+                self.opens = 0
+                self._transition(CLOSED)
+
+    def failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                # jittered so the instances of a deployment do not probe at the same time
+                self.open_for = min(self.max_open_time, self.open_time * 2 ** self.opens) * random.uniform(1.0, 1.25)
+                self.opened_at = time.time()
+                self.opens += 1
+                self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        logger.warning(f"Circuit {self.name}: {self.state} -> {state}"
+                       + (f" for {self.open_for:.1f}s after {self.failures} failures" if state == OPEN else ""))
+        self.state = state
+        circuit_breakers.transitions.add(1, {"dependency": self.name, "state": state})
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"state": self.state,
+                    "failures": self.failures,
+                    "retry_after": round(self._remaining(), 1) if self.state == OPEN else 0.0,
+                    "rejections": self.rejections}
+
+class CircuitBreakers:
+    """
+    Circuit breakers by dependency name, their states exported through the OTel meter.
+    """
+
+    def __init__(self, meter_name: str = METER_NAME):
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+        meter = metrics.get_meter(meter_name)
+        self.transitions = meter.create_counter(
+            "circuit_breaker.transitions", description="Circuit breaker state changes, by new state")
+        self.rejections = meter.create_counter(
+            "circuit_breaker.rejections", description="Calls failed fast by an open circuit")
+        meter.create_observable_gauge(
+            "circuit_breaker.state", callbacks=[self._observe_states],
+            description="Circuit breaker state: 0 closed, 1 half-open, 2 open")
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name)
+            return breaker
+
+    def _observe_states(self, options):
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return [Observation(STATE_VALUES[b.state], {"dependency": b.name}) for b in breakers]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {b.name: b.snapshot() for b in breakers}
+
+# global instance
+circuit_breakers = CircuitBreakers()
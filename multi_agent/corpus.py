@@ -0,0 +1,26 @@
+import os
+import re
+
+README = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "README.md")
+
+CATEGORIES = ["HEALTH", "ACCOUNT", "ACCOUNT-PERSON", "LEDGER", "CARD", "PLAYBOOK", "PAYMENT", "MEMORY"]
+CATEGORY_PATTERN = re.compile(r"^([A-Za-z-]+?)\s*(?:-\s*ok)?$", re.IGNORECASE)
+QUERY_PATTERN = re.compile(r"^(check|create|show|get|which|make|store)\b")
+
+def load_corpus(path: str = README) -> list:
+    """
+    (category, query) pairs of the README sample queries, grouped under their category headers.
+    """
+    corpus = []
+    category = None
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            match = CATEGORY_PATTERN.match(line)
+            if match and match.group(1).upper() in CATEGORIES:
+                category = match.group(1).upper()
+            elif category and line.startswith("INFO:"):
+                break
+            elif category and QUERY_PATTERN.match(line):
+                corpus.append((category, line))
+    return corpus
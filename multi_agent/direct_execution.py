@@ -0,0 +1,43 @@
+import logging
+
+from tool_catalog import get_tool_catalog, tool_result_payload
+from tool_results import structured_result, text_result
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+tool_catalog = get_tool_catalog()
+
+def direct_call(agent_name: str, operation: str, arguments: dict, allowed_tools: list,
+                fields: list = None, validate=None) -> dict:
+    """
+    Typed execution mode of a sub-agent: the orchestrator names the MCP operation and its arguments,
+    they are validated against the tool input schema (and validate(operation, arguments) if given)
+    and sent straight to the MCP server, without the sub-agent LLM. The payload comes back as a json block.
+    """
+    if operation not in allowed_tools:
+        return text_result(f"Unknown {agent_name} operation {operation}, expected one of {allowed_tools}", "error")
+
+    arguments = arguments or {}
+    try:
+        tool_catalog.validate_arguments(operation, arguments)
+        if validate is not None:
+            validate(operation, arguments)
+    except Exception as e:
+        logger.error(f"Direct {agent_name} call {operation} rejected: {e}")
+        return text_result(f"Invalid arguments for {operation}: {str(e)}", "error")
+
+    logger.info(f"Direct {agent_name} call: {operation} {list(arguments)}")
+    try:
+        result = tool_catalog.call_tool(operation, arguments)
+    except Exception as e:
+        logger.error(f"Error processing your query: {str(e)}")
+        return text_result(f"Error processing your query: {str(e)}", "error")
+
+    return structured_result([{
+        "tool": operation,
+        "arguments": {k: v for k, v in arguments.items() if k != "jwt"},
+        "status": result.get("status"),
+        "data": tool_result_payload(result),
+    }], fields)
@@ -0,0 +1,250 @@
+import os
+import re
+import json
+import uuid
+import asyncio
+import logging
+
+from strands.models import Model
+from strands.types.exceptions import StructuredOutputException
+
+from intent_router import (ACCOUNT_PATTERN, PERSON_PATTERN, CARD_PATTERN, DATE_PATTERN,
+                           HEALTH_PATTERN, CREATE_PATTERN, STATEMENT_PATTERN, PAYMENT_PATTERN)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# seconds before the first token and per generated token, roughly a small hosted model
+FAKE_MODEL_LATENCY = float(os.getenv("FAKE_MODEL_LATENCY", "0.3"))
+FAKE_MODEL_TOKEN_LATENCY = float(os.getenv("FAKE_MODEL_TOKEN_LATENCY", "0.005"))
+FAKE_MODEL_MAX_ANSWER = int(os.getenv("FAKE_MODEL_MAX_ANSWER", "2000"))
+
+CHARS_PER_TOKEN = 4
+
+TRANSACTION_PATTERN = re.compile(r"\b(transaction|deposit|withdraw)\b", re.IGNORECASE)
+WITHDRAW_PATTERN = re.compile(r"\bwithdraw\b", re.IGNORECASE)
+MEMORY_PATTERN = re.compile(r"\b(store|memory|remember)\b", re.IGNORECASE)
+AMOUNT_PATTERN = re.compile(r"\b\d+(?:\.\d+)?\b")
+SERVICES = ["account", "ledger", "card", "payment"]
+
+def prompt_text(messages: list) -> str:
+    """
+    Text of the user message that opened the current turn.
+    """
+    for message in reversed(messages):
+        if message["role"] == "user" and not any("toolResult" in c for c in message["content"]):
+            return " ".join(c["text"] for c in message["content"] if "text" in c)
+    return ""
+
+def amount_of(text: str) -> float:
+    # ids and dates also hold digits, drop them first
+    for pattern in (ACCOUNT_PATTERN, PERSON_PATTERN, CARD_PATTERN, DATE_PATTERN):
+        text = pattern.sub(" ", text)
+    amounts = AMOUNT_PATTERN.findall(text)
+    return float(amounts[0]) if amounts else 100.0
+
+def plan_agent_calls(text: str, tool_names: set) -> list:
+    """
+    Orchestrator turn: which sub-agents a request goes to, each with the whole request as query.
+    """
+    if HEALTH_PATTERN.search(text):
+        services = [s for s in SERVICES if re.search(rf"\b{s}\b", text, re.IGNORECASE)] or SERVICES
+        names = [f"{s}_agent" for s in services]
+    else:
+        names = []
+        if CARD_PATTERN.search(text):
+            names.append("payment_agent" if PAYMENT_PATTERN.search(text) else "card_agent")
+        if ACCOUNT_PATTERN.search(text) or PERSON_PATTERN.search(text):
+            if TRANSACTION_PATTERN.search(text) or STATEMENT_PATTERN.search(text):
+                names.append("ledger_agent")
+            elif not CARD_PATTERN.search(text) or CREATE_PATTERN.search(text):
+                names.append("account_agent")
+        if MEMORY_PATTERN.search(text):
+            names.append("memory_agent")
+
+    return [(name, {"query": text}) for name in names if name in tool_names]
+
+def plan_mcp_calls(text: str, tool_names: set) -> list:
+    """
+    Sub-agent turn: the MCP calls a request maps to, with the prompt defaults filled in.
+    """
+    accounts = list(dict.fromkeys(ACCOUNT_PATTERN.findall(text)))
+    persons = list(dict.fromkeys(PERSON_PATTERN.findall(text)))
+    cards = list(dict.fromkeys(CARD_PATTERN.findall(text)))
+    dates = DATE_PATTERN.findall(text)
+    creating = CREATE_PATTERN.search(text) or re.search(r"\bmake\b", text, re.IGNORECASE)
+
+    if HEALTH_PATTERN.search(text):
+        calls = [(f"{s}_healthy", {}) for s in SERVICES]
+    elif MEMORY_PATTERN.search(text):
+        calls = [("store_account_memory", {"account": a, "person": p, "relations": "HAS"})
+                 for a in accounts for p in persons[:1]]
+        calls += [("store_card_memory", {"card": c, "account": a, "relations": "ISSUED"})
+                  for c in cards for a in accounts[:1]]
+    elif TRANSACTION_PATTERN.search(text):
+        calls = [("create_moviment_transaction", {"account": a,
+                                                  "type": "WITHDRAW" if WITHDRAW_PATTERN.search(text) else "DEPOSIT",
+                                                  "currency": "BRL",
+                                                  "amount": amount_of(text)}) for a in accounts]
+    elif PAYMENT_PATTERN.search(text):
+        if creating:
+            calls = [("create_payment", {"card": c, "type": "CREDIT", "terminal": "TERM-1", "mcc": "FOOD",
+                                         "currency": "BRL", "amount": amount_of(text)}) for c in cards]
+        else:
+            calls = [("get_card_payment", {"card": c, "date": dates[0] if dates else "2025-01-01"}) for c in cards]
+    elif creating:
+        calls = [("create_card", {"card": c, "account": accounts[0], "holder": "JOHN DOE", "type": "CREDIT",
+                                  "model": "CHIP", "status": "ISSUED"}) for c in cards if accounts and "create_card" in tool_names]
+        if not calls:
+            calls = [("create_account", {"account": a, "person": persons[0]}) for a in accounts if persons]
+    elif STATEMENT_PATTERN.search(text):
+        calls = [("get_account_statement", {"account": a}) for a in accounts]
+    else:
+        calls = [("get_card", {"card": c}) for c in cards]
+        calls += [("get_account_from_person", {"person": p}) for p in persons]
+        calls += [("get_account", {"account": a}) for a in accounts]
+
+    return [(name, arguments) for name, arguments in calls if name in tool_names]
+
+def answer_text(messages: list) -> str:
+    """
+    Final answer of a turn: the tool results of the turn, as returned.
+    """
+    results = []
+    for message in reversed(messages):
+        if message["role"] == "user" and not any("toolResult" in c for c in message["content"]):
+            break
+        for content in message["content"]:
+            if "toolResult" in content:
+                for block in content["toolResult"].get("content", []):
+                    results.append(block["text"] if "text" in block else json.dumps(block.get("json"), ensure_ascii=False))
+
+    if not results:
+        return "I couldn't map this request to any operation, please rephrase it."
+    return "\n".join(reversed(results))[:FAKE_MODEL_MAX_ANSWER]
+
+def tool_payloads(messages: list) -> list:
+    """
+    Dict payloads of the tool results of a turn, newest first, sub-agent json results unwrapped.
+    """
+    payloads = []
+    for message in reversed(messages):
+        if message["role"] == "user" and not any("toolResult" in c for c in message["content"]):
+            break
+        for content in reversed(message["content"]):
+            for block in content.get("toolResult", {}).get("content", []):
+                payload = block.get("json")
+                if payload is None:
+                    try:
+                        payload = json.loads(block.get("text", ""))
+                    except ValueError:
+                        continue
+                if isinstance(payload, dict) and "results" in payload:
+                    payload = [call.get("data") for call in payload["results"]]
+                payloads.extend(p for p in (payload if isinstance(payload, list) else [payload]) if isinstance(p, dict))
+    return payloads
+
+def estimate_tokens(messages: list, system_prompt: str = None, tool_specs: list = None) -> int:
+    chars = len(system_prompt or "") + len(json.dumps(tool_specs or [], default=str))
+    chars += len(json.dumps(messages, default=str))
+    return chars // CHARS_PER_TOKEN
+
+class FakeModel(Model):
+    """
+    Deterministic stand-in of a BedrockModel: calls the tools a request maps to (same patterns as
+    the fast path router), then answers with their results. Latency and token usage are simulated.
+    """
+
+    def __init__(self, **model_config):
+        self.config = {
+            "model_id": "fake",
+            "latency": FAKE_MODEL_LATENCY,
+            "token_latency": FAKE_MODEL_TOKEN_LATENCY,
+            **model_config,
+        }
+        self._cached_prefixes = set()
+
+    def cache_usage(self, tool_specs: list, system_prompt_content: list) -> tuple:
+        """
+        (read, write) tokens of the prompt cache: the prefix up to a system cachePoint is written
+        on its first call and read after.
+        """
+        blocks = system_prompt_content or []
+        checkpoint = next((i for i, block in enumerate(blocks) if "cachePoint" in block), None)
+        if checkpoint is None:
+            return 0, 0
+
+        prefix = json.dumps([tool_specs or [], blocks[:checkpoint]], sort_keys=True, default=str)
+        tokens = len(prefix) // CHARS_PER_TOKEN
+        if prefix in self._cached_prefixes:
+            return tokens, 0
+        self._cached_prefixes.add(prefix)
+        return 0, tokens
+
+    def update_config(self, **model_config) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> dict:
+        return self.config
+
+    def plan(self, messages: list, tool_specs: list) -> tuple:
+        """
+        (tool calls, text) of the next assistant message.
+        """
+        tool_names = {spec["name"] for spec in tool_specs or []}
+        last = messages[-1] if messages else {"role": "user", "content": []}
+
+        if last["role"] == "user" and not any("toolResult" in c for c in last["content"]):
+            text = prompt_text(messages)
+            if any(name.endswith("_agent") for name in tool_names):
+                calls = plan_agent_calls(text, tool_names)
+            else:
+                calls = plan_mcp_calls(text, tool_names)
+            if calls:
+                return calls, ""
+
+        return [], answer_text(messages)
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, *, tool_choice=None, **kwargs):
+        calls, text = self.plan(messages, tool_specs)
+
+        output = text + json.dumps([arguments for _, arguments in calls])
+        output_tokens = len(output) // CHARS_PER_TOKEN + 1
+        latency = self.config["latency"] + output_tokens * self.config["token_latency"]
+        await asyncio.sleep(latency)
+
+        yield {"messageStart": {"role": "assistant"}}
+        if text:
+            yield {"contentBlockStart": {"start": {}}}
+            yield {"contentBlockDelta": {"delta": {"text": text}}}
+            yield {"contentBlockStop": {}}
+        for name, arguments in calls:
+            tool_use_id = f"tooluse_{uuid.uuid4().hex[:16]}"
+            yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": tool_use_id, "name": name}}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(arguments)}}}}
+            yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "tool_use" if calls else "end_turn"}}
+
+        cache_read, cache_write = self.cache_usage(tool_specs, kwargs.get("system_prompt_content"))
+        input_tokens = max(0, estimate_tokens(messages, system_prompt, tool_specs) - cache_read - cache_write)
+        yield {"metadata": {
+            "usage": {"inputTokens": input_tokens, "outputTokens": output_tokens,
+                      "totalTokens": input_tokens + output_tokens + cache_read + cache_write,
+                      "cacheReadInputTokens": cache_read, "cacheWriteInputTokens": cache_write},
+            "metrics": {"latencyMs": int(latency * 1000)},
+        }}
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        """
+        The newest tool result of the turn that fits output_model.
+        """
+        await asyncio.sleep(self.config["latency"])
+        for payload in tool_payloads(prompt):
+            try:
+                output = output_model.model_validate(payload)
+            except ValueError:
+                continue
+            yield {"output": output}
+            return
+        raise StructuredOutputException(f"FakeModel found no tool result matching {output_model.__name__}")
@@ -0,0 +1,119 @@
+import os
+import re
+import time
+import asyncio
+import logging
+import threading
+
+from tool_catalog import get_tool_catalog, tool_result_payload
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HEALTH_TIMEOUT = float(os.getenv("HEALTH_TIMEOUT", "5"))
+HEALTH_CACHE_TTL = float(os.getenv("HEALTH_CACHE_TTL", "10"))
+
+HEALTH_TOOLS = {
+    "ACCOUNT": "account_healthy",
+    "LEDGER": "ledger_healthy",
+    "CARD": "card_healthy",
+    "PAYMENT": "payment_healthy",
+}
+
+# payload fields holding the service status, the first one present is used
+STATUS_FIELDS = ["status", "status_code", "statusCode", "code"]
+HEALTHY_WORDS = {"ok", "up", "healthy", "pass", "success"}
+# answers about the caller (its token), not about the service
+CALLER_CODES = {401, 403}
+
+CODE_PATTERN = re.compile(r"^\s*([1-5]\d\d)\b")
+
+def status_code(payload):
+    """
+    Status of a health payload: an int code, a status word, or None when the payload has neither.
+    """
+    if isinstance(payload, dict):
+        value = next((payload[f] for f in STATUS_FIELDS if f in payload), None)
+    else:
+        value = payload
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = CODE_PATTERN.match(str(value))
+    return int(match.group(1)) if match else str(value).strip().lower()
+
+def is_healthy(result: dict) -> bool:
+    """
+    Healthy rule from the sub-agent prompts: status code 200 is healthy, otherwise unhealthy.
+    Read from the status field of the payload, a successful call without one is healthy.
+    """
+    if result.get("status") != "success":
+        return False
+
+    code = status_code(tool_result_payload(result))
+    if code is None or isinstance(code, bool):
+        return code is not False
+    if isinstance(code, int):
+        return 200 <= code < 300
+    return code in HEALTHY_WORDS
+
+def is_service_answer(result: dict) -> bool:
+    """
+    Whether the result tells about the service itself, the only ones cached: failed calls
+    (transport, timeouts) and auth answers about the caller's token are not shared with other callers.
+    """
+    return result.get("status") == "success" and status_code(tool_result_payload(result)) not in CALLER_CODES
+
+class HealthChecker:
+    """
+    Calls the *_healthy MCP tools concurrently, each bounded by its own timeout (passed to the MCP call).
+    Service answers are cached for a short window so dashboards and probes do not hammer the services.
+    """
+
+    def __init__(self, tool_catalog, timeout: float = HEALTH_TIMEOUT, cache_ttl: float = HEALTH_CACHE_TTL):
+        self.tool_catalog = tool_catalog
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, service: str):
+        with self._lock:
+            entry = self._cache.get(service)
+        if entry and time.time() - entry[0] < self.cache_ttl:
+            return entry[1]
+        return None
+
+    async def _check(self, service: str, token: str) -> str:
+        status = self._cached(service)
+        if status is not None:
+            return status
+
+        try:
+            result = await asyncio.to_thread(self.tool_catalog.call_tool, HEALTH_TOOLS[service], {}, token, self.timeout)
+        except Exception as e:
+            logger.error(f"Health check of {service} failed. Reason: {e}")
+            return "UNHEALTHY"
+
+        status = "HEALTHY" if is_healthy(result) else "UNHEALTHY"
+        if is_service_answer(result):
+            with self._lock:
+                self._cache[service] = (time.time(), status)
+        else:
+            logger.warning(f"Health check of {service} not cached: {tool_result_payload(result)}")
+        return status
+
+    async def check_async(self, services: list, token: str) -> dict:
+        statuses = await asyncio.gather(*(self._check(service, token) for service in services))
+        return dict(zip(services, statuses))
+
+    def check(self, services: list, token: str) -> dict:
+        return asyncio.run(self.check_async(services, token))
+
+def render_health(statuses: dict) -> str:
+    return "\n".join(f"{service}: {status}" for service, status in statuses.items())
+
+# global instance
+health_checker = HealthChecker(get_tool_catalog())
@@ -0,0 +1,178 @@
+import re
+import json
+import logging
+
+from tool_catalog import get_tool_catalog, tool_result_payload
+from health_check import HEALTH_TOOLS, health_checker, render_health
+from batch_lookup import batch_lookup
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Entity patterns, same formats the sub-agent prompts enforce
+ACCOUNT_PATTERN = re.compile(r"\bACC-\d{1,3}(?:\.\d{3})*\b")
+PERSON_PATTERN = re.compile(r"\bP-\d{1,3}(?:\.\d{3})*\b")
+CARD_PATTERN = re.compile(r"\b\d{3}\.\d{3}\.\d{3}\.\d{3}\b")
+DATE_PATTERN = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+
+HEALTH_PATTERN = re.compile(r"\bhealth(y)?\b", re.IGNORECASE)
+READ_PATTERN = re.compile(r"\b(show|get|which|what|check|list|infos?|details?|data)\b", re.IGNORECASE)
+CREATE_PATTERN = re.compile(r"\bcreate\b", re.IGNORECASE)
+
+# Anything that needs defaults, validation, several steps or memory goes to the LLM
+AMBIGUOUS_PATTERN = re.compile(
+    r"\b(and after|after create|then|store|memory|remember|make|transaction|deposit|withdraw|\d+\s+(accounts|cards))\b",
+    re.IGNORECASE)
+
+STATEMENT_PATTERN = re.compile(r"\b(statements?|activity|balance|moviments?|ledger)\b", re.IGNORECASE)
+PAYMENT_PATTERN = re.compile(r"\bpayments?\b", re.IGNORECASE)
+
+class Intent:
+    """
+    A recognized request, mapped straight to the MCP tool calls that answer it.
+    """
+
+    def __init__(self, name: str, calls: list, services: list = None):
+        self.name = name
+        self.calls = calls
+        self.services = services or []
+
+    def __repr__(self) -> str:
+        return f"Intent({self.name}, {self.services or self.calls})"
+
+def parse_health(query: str):
+    if re.search(r"\ball\b", query, re.IGNORECASE):
+        services = list(HEALTH_TOOLS)
+    else:
+        services = [s for s in HEALTH_TOOLS if re.search(rf"\b{s}\b", query, re.IGNORECASE)]
+
+    if not services:
+        return None
+
+    return Intent("health", [], services=services)
+
+def unique(ids: list) -> list:
+    return list(dict.fromkeys(ids))
+
+def parse_batch(query: str, accounts: list, persons: list, cards: list, dates: list):
+    """
+    Several ids of a single kind, e.g. "ACC-4.000.003 and ACC-4.000.004", become one concurrent batch.
+    """
+    if sum(1 for ids in (accounts, persons, cards) if ids) != 1:
+        return None
+
+    if cards:
+        if PAYMENT_PATTERN.search(query):
+            if len(dates) != 1:
+                return None
+            return Intent("batch", [("get_card_payment", {"card": card, "date": dates[0]}) for card in unique(cards)])
+        return Intent("batch", [("get_card", {"card": card}) for card in unique(cards)])
+
+    if persons:
+        return Intent("batch", [("get_account_from_person", {"person": person}) for person in unique(persons)])
+
+    if STATEMENT_PATTERN.search(query):
+        return Intent("batch", [("get_account_statement", {"account": account}) for account in unique(accounts)])
+
+    return Intent("batch", [("get_account", {"account": account}) for account in unique(accounts)])
+
+def parse_intent(query: str):
+    """
+    Map a request to an Intent, or None when it is not unambiguously recognizable.
+    """
+    if AMBIGUOUS_PATTERN.search(query):
+        return None
+
+    if HEALTH_PATTERN.search(query):
+        return parse_health(query)
+
+    accounts = ACCOUNT_PATTERN.findall(query)
+    persons = PERSON_PATTERN.findall(query)
+    cards = CARD_PATTERN.findall(query)
+    dates = DATE_PATTERN.findall(query)
+
+    if CREATE_PATTERN.search(query):
+        if len(accounts) == 1 and len(persons) == 1 and not cards and re.search(r"\baccount\b", query, re.IGNORECASE):
+            return Intent("create_account", [("create_account", {"account": accounts[0], "person": persons[0]})])
+        return None
+
+    if not READ_PATTERN.search(query):
+        return None
+
+    if len(accounts) + len(persons) + len(cards) > 1:
+        return parse_batch(query, accounts, persons, cards, dates)
+
+    if len(accounts) + len(persons) + len(cards) == 0:
+        return None
+
+    if cards:
+        if PAYMENT_PATTERN.search(query):
+            if len(dates) != 1:
+                return None
+            return Intent("get_card_payment", [("get_card_payment", {"card": cards[0], "date": dates[0]})])
+        return Intent("get_card", [("get_card", {"card": cards[0]})])
+
+    if persons:
+        return Intent("get_account_from_person", [("get_account_from_person", {"person": persons[0]})])
+
+    if STATEMENT_PATTERN.search(query):
+        return Intent("get_account_statement", [("get_account_statement", {"account": accounts[0]})])
+
+    return Intent("get_account", [("get_account", {"account": accounts[0]})])
+
+def query_tier(query: str, default: str) -> str:
+    """
+    Model tier a query needs: lite for health checks and single id lookups, pro for creates,
+    premier for multi-step requests, otherwise the agent default.
+    """
+    if AMBIGUOUS_PATTERN.search(query):
+        return "premier"
+
+    if CREATE_PATTERN.search(query):
+        return "pro"
+
+    ids = len(ACCOUNT_PATTERN.findall(query)) + len(PERSON_PATTERN.findall(query)) + len(CARD_PATTERN.findall(query))
+    if HEALTH_PATTERN.search(query) or (READ_PATTERN.search(query) and ids <= 1):
+        return "lite"
+
+    return default
+
+def render(results: list) -> str:
+    payloads = [tool_result_payload(result) for result in results]
+    return json.dumps(payloads[0] if len(payloads) == 1 else payloads, indent=2, ensure_ascii=False)
+
+def route(query: str, token: str):
+    """
+    Answer recognizable requests with direct MCP calls, None means fall back to the orchestrator.
+    """
+    intent = parse_intent(query)
+    if intent is None:
+        return None
+
+    logger.info(f"Fast path: {intent}")
+
+    if intent.name == "health":
+        return render_health(health_checker.check(intent.services, token))
+
+    if intent.name == "batch":
+        return json.dumps(batch_lookup.run(intent.calls, token), indent=2, ensure_ascii=False)
+
+    tool_catalog = get_tool_catalog()
+    results = [tool_catalog.call_tool(tool_name, arguments, token) for tool_name, arguments in intent.calls]
+
+    return render(results)
+
+# Dry run over the README sample queries
+if __name__ == "__main__":
+    import os
+
+    readme = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "README.md")
+    with open(readme) as f:
+        for line in f:
+            line = line.strip()
+            if re.match(r"^(check|create|show|get|which|make|store)\b", line):
+                intent = parse_intent(line)
+                print(f"{'FAST' if intent else 'LLM '} | {query_tier(line, 'premier'):<7} | {line[:90]}")
+                if intent:
+                    print(f"       {intent}")
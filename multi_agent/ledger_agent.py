@@ -1,15 +1,18 @@
 import logging
-import boto3
 import time
-import json
 
-from main_memory import main_memory
-
-from mcp.client.streamable_http import streamablehttp_client
+from request_context import get_token
+from tool_catalog import get_tool_catalog
+from agent_pool import SubAgentPool
+from stream_events import forward_stream
+from direct_execution import direct_call
+from agent_metrics import MetricsHook
+from prompt_cache import cached_system_prompt
+from tool_results import mcp_payloads, structured_result, text_result
+from model_registry import get_model, agent_tier, invoke_with_escalation, answered_with_tools, ModelBreakerHook
+from intent_router import query_tier
 
 from strands import Agent, tool
-from strands.models import BedrockModel
-from strands.tools.mcp.mcp_client import MCPClient
 
 from strands.hooks import (HookProvider, 
                            HookRegistry, 
@@ -55,43 +58,50 @@ LEDGER_SYSTEM_PROMPT = """
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Setup a model
-#model_id = lite pro premier
-model_id = "arn:aws:bedrock:us-east-2:908671954593:inference-profile/us.amazon.nova-premier-v1:0"  
-
 logger.info('\033[1;33m Starting the Ledger Agent... \033[0m')
-logger.info(f'\033[1;33m model_id: {model_id} \033[0m \n')
-
-# Create boto3 session
-session = boto3.Session(
-    region_name='us-east-2',
-)
-
-bedrock_model = BedrockModel(
-        model_id=model_id,
-        temperature=0.0,
-        boto_session=session,
-)
 
-# load mcp servers
-mcp_url = "http://127.0.0.1:9002/mcp"
+# default model tier, simple requests run on a cheaper one (see model_registry)
+LEDGER_TIER = agent_tier("ledger")
 
-def create_streamable_http_mcp_server(mcp_url: str):
-    return streamablehttp_client(mcp_url)
+# cached tools bound to the shared pool of warm mcp sessions
+tool_catalog = get_tool_catalog()
 
-streamable_http_mcp_server = MCPClient(lambda: create_streamable_http_mcp_server(mcp_url))
+LEDGER_TOOLS = ["ledger_healthy",
+                "create_moviment_transaction",
+                "get_account_statement"]
 
 class ToolValidationError(Exception):
     """Custom exception to abort tool calls immediately."""
     pass
 
+def validate_transaction(tool_name: str, tool_input: dict) -> None:
+    """
+    Transaction constraints, applied by the agent hook and by the typed mode.
+    """
+    if tool_name != "create_moviment_transaction":
+        return
+
+    amount = tool_input.get("amount")
+
+    try:
+        amount = float(amount)
+    except Exception:
+        logger.error(f"Invalid amount: {amount}. Must be a numeric.")
+        raise ToolValidationError(f"Invalid amount: {amount}. Must be a numeric.")
+
+    # Apply constraints
+    if amount <= 0 or amount > 1000:
+        logger.error(f"Invalid amount {amount}. Must be greater than 0 and less than 1000.")
+        raise ToolValidationError(f"Invalid amount {amount}.  Must be greater than 0 and less than 1000")
+
+    logger.info(f"[LedgerHook] Validated transaction amount: {amount}")
+
 # Agent hook setup
 class AgentHook(HookProvider):
 
     def __init__(self):
         self.start_agent = ""
         self.tool_name = "unknown"
-        self.metrics = {}
 
     def register_hooks(self, registry: HookRegistry) -> None:
         registry.add_callback(BeforeInvocationEvent, self.agent_start)
@@ -109,15 +119,6 @@ class AgentHook(HookProvider):
 
         duration = time.time() - self.start_agent
         logger.info(f"Request completed - Agent: {event.agent.name} - Duration: {duration:.2f}s")
-        
-        self.metrics["total_requests"] = self.metrics.get("total_requests", 0) + 1
-        self.metrics["avg_duration"] = (
-            self.metrics.get("avg_duration", 0) * 0.9 + duration * 0.1 # Exponencial Moving Average 
-        )
-
-        logger.info(f" *** *** self.metrics *** *** ")
-        logger.info(f" {self.metrics}")
-        logger.info(f" *** *** self.metrics *** *** ")
 
     def before_tool(self, event: BeforeToolCallEvent) -> None:
         logger.info(f"*** Tool invocation - agent: {event.agent.name} : { event.tool_use.get('name') } *** ")
@@ -126,22 +127,11 @@ class AgentHook(HookProvider):
         tool_input = event.tool_use.get("input", {})
 
         if self.tool_name == "create_moviment_transaction":
-            amount = tool_input.get("amount")
-    
             try:
-                amount = float(amount)
-            except Exception:
-                logger.error(f"Invalid amount: {amount}. Must be a numeric.")
+                validate_transaction(self.tool_name, tool_input)
+            except ToolValidationError:
                 event.abort = True
-                raise ToolValidationError(f"Invalid amount: {amount}. Must be a numeric.")
-            
-            # Apply constraints
-            if amount <= 0 or amount > 1000:
-                logger.error(f"Invalid amount {amount}. Must be greater than 0 and less than 1000.")
-                event.abort = True
-                raise ToolValidationError(f"Invalid amount {amount}.  Must be greater than 0 and less than 1000")
-        
-            logger.info(f"[LedgerHook] Validated transaction amount: {amount}")
+                raise
 
     def after_tool(self, event: AfterToolCallEvent) -> None:
         logger.info(f" *** AfterToolCallEvent **** ")
@@ -149,13 +139,35 @@ class AgentHook(HookProvider):
         self.tool_name = event.tool_use.get("name")
         logger.info(f"* Tool completed - agent: {event.agent.name} : {self.tool_name}")
 
+def build_ledger_agent(streamable_http_mcp_server) -> Agent:
+    """
+    Build the LEDGER agent once, its tools are bound to the given pooled mcp session.
+    """
+    selected_tools = tool_catalog.select(streamable_http_mcp_server, LEDGER_TOOLS)
+
+    logger.info(f"Available MCP tools: {[tool.tool_name for tool in selected_tools]}")
+
+    return Agent(name="main",
+                system_prompt=cached_system_prompt(LEDGER_SYSTEM_PROMPT),
+                model=get_model(LEDGER_TIER),
+                tools=selected_tools,
+                hooks=[AgentHook(), MetricsHook("ledger"), ModelBreakerHook()],
+                retry_strategy=None,
+                callback_handler=forward_stream("ledger")
+            )
+
+ledger_agent_pool = SubAgentPool("ledger", build_ledger_agent, tool_catalog)
+
 @tool
-def ledger_agent(query: str) -> str:
+def ledger_agent(query: str = "", operation: str = None, arguments: dict = None, fields: list = None) -> dict:
     """
     Process and respond all LEDGER queries using a specialized LEDGER agent.
 
     Args:
         query: Given an transaction, create a transaction, get information such as ledger service healhy status, bank statement, financial moviment, account activity, balances.
+        operation: Optional typed mode, one of ledger_healthy, create_moviment_transaction or get_account_statement. Given with its arguments the MCP tool is called directly, without the LEDGER agent, use it whenever the request maps to exactly one operation with all its arguments.
+        arguments: Arguments of the operation, e.g. {"account": "ACC-302.201"} for get_account_statement.
+        fields: Optional payload fields the answer needs, e.g. ["account_id", "person_id"], everything else is left out.
         
     Returns:
         ledger information such as bank statement, financial moviment, account activity, balances.
@@ -164,68 +176,43 @@ def ledger_agent(query: str) -> str:
     logger.info("function => ledger_agent")
 
     # load access token
-    token = main_memory.get_token()
+    token = get_token()
     if not token:
         logger.error("Error, I couldn't process No JWT token available")
-        return "Error, I couldn't process No JWT token available"
+        return text_result("Error, I couldn't process No JWT token available", "error")
          
-    context={"jwt":token}
+
+    # typed mode: one MCP call with the structured arguments, no LLM hop
+    if operation:
+        return direct_call("ledger", operation, arguments, LEDGER_TOOLS, fields, validate=validate_transaction)
 
     # Format the query for the agent
-    formatted_query = f"Please process the following query: {query} with context:{context}"
-    all_tools = []
+    formatted_query = f"Please process the following query: {query}"
  
     try:
         logger.info("Routed to Ledger Agent")
-        
-        agent_hook = AgentHook()
-
-        with streamable_http_mcp_server:
-            all_tools.extend(streamable_http_mcp_server.list_tools_sync())
-
-            selected_tools = [
-                t for t in all_tools 
-                if t.tool_name in ["ledger_healthy",
-                                   "create_moviment_transaction", 
-                                   "get_account_statement"]
-            ]
-
-            logger.info(f"Available MCP tools: {[tool.tool_name for tool in selected_tools]}")
-
-            # Create the math agent with calculator capability
-            agent = Agent(name="main",
-                        system_prompt=LEDGER_SYSTEM_PROMPT,
-                        model=bedrock_model, 
-                        tools=selected_tools,
-                        hooks=[agent_hook],
-                        callback_handler=None,
-                    )
-    
+
+        with ledger_agent_pool.agent() as agent:
             try:
-                agent_response = agent(formatted_query)
+                agent_response = invoke_with_escalation(agent, formatted_query, query_tier(query, LEDGER_TIER),
+                                                        answered_with_tools,
+                                                        fatal=(ToolValidationError,))
                 text_response = str(agent_response)
 
+                # the MCP payloads themselves, not the agent's prose rendition of them
+                payloads = mcp_payloads(agent.messages, LEDGER_TOOLS)
+                if payloads:
+                    return structured_result(payloads, fields)
+
                 if len(text_response) > 0:
-                    return json.dumps({
-                        "status": "success",
-                        "response": text_response
-                    })
-
-                return json.dumps({
-                    "status": "error",
-                    "reason": "Error but I couldn't process this request due a problem. Please check if your query is clearly stated or try rephrasing it."
-                })
+                    return text_result(text_response)
+
+                return text_result("Error but I couldn't process this request due a problem. Please check if your query is clearly stated or try rephrasing it.", "error")
                         
             except ToolValidationError as e:
                 logger.error(f"Transaction aborted: {e}")
-                return json.dumps({
-                    "status": "error",
-                    "reason": f"Transaction aborted: {str(e)}"
-                })
+                return text_result(f"Transaction aborted: {str(e)}", "error")
        
     except Exception as e:
         logger.error(f"Error processing your query: {str(e)}")
-        return json.dumps({
-            "status": "error",
-            "reason": f"Error processing your query: {str(e)}"
-        })
\ No newline at end of file
+        return text_result(f"Error processing your query: {str(e)}", "error")
\ No newline at end of file
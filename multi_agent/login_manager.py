@@ -1,6 +1,14 @@
+import os
+import time
+import random
+import hashlib
 import logging
 import aiohttp
 import asyncio
+import threading
+
+from request_context import jwt_claims
+from circuit_breaker import circuit_breakers, CircuitOpenError
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -9,39 +17,166 @@ logger = logging.getLogger(__name__)
 SESSION_TIMEOUT = 30
 session_timeout = aiohttp.ClientTimeout(total=SESSION_TIMEOUT)
 
+OAUTH_URL = os.getenv("OAUTH_URL", "https://go-oauth-lambda.architecture.caradhras.io/oauth_credential")
+TOKEN_REFRESH_MARGIN = float(os.getenv("TOKEN_REFRESH_MARGIN", "60"))
+TOKEN_DEFAULT_TTL = float(os.getenv("TOKEN_DEFAULT_TTL", "3600"))
+TOKEN_RETRY_INTERVAL = float(os.getenv("TOKEN_RETRY_INTERVAL", "15"))
+
+class UserToken:
+    """
+    Cached token of one user, the credentials are kept in memory to refresh it in background.
+    """
+
+    def __init__(self, username: str, password: str, token: str):
+        self.username = username
+        self.password = password
+        self.token = token
+        self.expires_at = float(jwt_claims(token).get("exp") or time.time() + TOKEN_DEFAULT_TTL)
+        self.refresh_handle = None
+
+    def is_valid(self) -> bool:
+        return self.token is not None and time.time() < self.expires_at
+
 class LoginManager:
+    """
+    Logs users in against the OAuth endpoint and keeps their tokens fresh.
+    Runs its own event loop thread holding one pooled HTTP session, so refreshes
+    happen in background, before expiry, and concurrent logins with the same credentials share one request.
+    """
 
-    def __init__(self):
+    def __init__(self, url: str = OAUTH_URL, refresh_margin: float = TOKEN_REFRESH_MARGIN):
+        self.url = url
+        self.refresh_margin = refresh_margin
+        self.breaker = circuit_breakers.get(f"oauth:{url}")
         self.logged_in = False
-        self.user_token = None
         self.username = None
+        self._tokens = {}
+        self._inflight = {}
+        self._session = None
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="login-manager", daemon=True).start()
+            return self._loop
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=session_timeout)
+        return self._session
 
     async def login(self, username: str, password: str) -> bool:
+        future = asyncio.run_coroutine_threadsafe(self._login(username, password), self._get_loop())
+        user_token = await asyncio.wrap_future(future)
+        if user_token is None:
+            return False
+
+        self.logged_in = True
+        self.username = username
+        return True
+
+    async def _login(self, username: str, password: str):
+        # single flight: concurrent logins with the same credentials wait for the same request,
+        # a different password never joins (and never gets the result of) another one
+        key = (username, hashlib.sha256(password.encode()).hexdigest())
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._issue_token(username, password))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        return await asyncio.shield(inflight)
+
+    async def _issue_token(self, username: str, password: str):
+        token = await self._fetch_token(username, password)
+        if token is None:
+            return None
+
+        user_token = UserToken(username, password, token)
+        previous = self._tokens.get(username)
+        if previous is not None and previous.refresh_handle is not None:
+            previous.refresh_handle.cancel()
 
+        self._tokens[username] = user_token
+        self._schedule_refresh(user_token, user_token.expires_at - self.refresh_margin - time.time())
+        return user_token
+
+    async def _fetch_token(self, username: str, password: str):
         headers = {"Content-Type": "application/json"}
-        url = f"https://go-oauth-lambda.architecture.caradhras.io/oauth_credential"
 
         payload = {
             "user" :username,
             "password": password,
         }
 
-        async with aiohttp.ClientSession(timeout=session_timeout) as session:
-            async with session.post(url, headers=headers, json=payload) as resp:
+        try:
+            self.breaker.allow()
+        except CircuitOpenError as e:
+            logger.warning(f"Login skipped: {e}")
+            return None
+
+        try:
+            async with self._get_session().post(self.url, headers=headers, json=payload) as resp:
+                # invalid credentials are an answer, throttling and server errors are not
+                if resp.status == 429 or resp.status >= 500:
+                    self.breaker.failure()
+                else:
+                    self.breaker.success()
+
                 if resp.status == 200:
                     data = await resp.json()
-                    
-                    self.logged_in = True
-                    self.user_token = data.get("token")        
-                    self.username = username
-                    return True
-                else:
-                    logger.warning(f"Login failed {resp.status}")
-                    return False
+                    return data.get("token")
+
+                logger.warning(f"Login failed {resp.status}")
+                return None
+        except Exception as e:
+            self.breaker.failure()
+            logger.error(f"Login request failed. Reason: {e}")
+            return None
+
+    def _schedule_refresh(self, user_token: UserToken, delay: float) -> None:
+        delay = max(0.0, delay)
+        logger.info(f"Token refresh of {user_token.username} scheduled in {delay:.0f}s")
+        user_token.refresh_handle = self._loop.call_later(
+            delay, lambda: asyncio.ensure_future(self._refresh(user_token)))
+
+    async def _refresh(self, user_token: UserToken) -> None:
+        if self._tokens.get(user_token.username) is not user_token:
+            return
+
+        refreshed = await self._login(user_token.username, user_token.password)
+        if refreshed is None:
+            # jittered, and not before the OAuth circuit lets a call through again
+            delay = max(self.breaker.retry_after(), TOKEN_RETRY_INTERVAL * random.uniform(0.5, 1.5))
+            logger.warning(f"Token refresh of {user_token.username} failed, retrying in {delay:.0f}s")
+            if user_token.is_valid():
+                self._schedule_refresh(user_token, delay)
+
+    def is_authenticated(self, username: str = None) -> bool:
+        return self.get_token(username) is not None
+
+    def get_token(self, username: str = None):
+        """
+        Cached token of username (default: the last user logged in), None once it expired.
+        """
+        user_token = self._tokens.get(username or self.username)
+        if user_token is None or not user_token.is_valid():
+            return None
+        return user_token.token
 
+    def close(self) -> None:
+        if self._loop is None:
+            return
 
-    def is_authenticated(self) -> bool:
-        return self.logged_in
+        async def _close():
+            for user_token in self._tokens.values():
+                if user_token.refresh_handle is not None:
+                    user_token.refresh_handle.cancel()
+            if self._session is not None:
+                await self._session.close()
 
-    def get_token(self):
-        return self.user_token
+        asyncio.run_coroutine_threadsafe(_close(), self._loop).result(timeout=SESSION_TIMEOUT)
+        self._loop.call_soon_threadsafe(self._loop.stop)
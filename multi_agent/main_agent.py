@@ -1,25 +1,24 @@
 import os
 import logging
-import boto3
-import re
 import asyncio
-import shutil
+import threading
 from dotenv import load_dotenv
 
 from strands import Agent
-from strands.models import BedrockModel
-from strands_tools import calculator
-from strands.telemetry import StrandsTelemetry
-from strands.agent.conversation_manager import SlidingWindowConversationManager
-from strands.session.file_session_manager import FileSessionManager
-
-from main_memory import main_memory
-from login_manager import LoginManager
-from account_agent import account_agent
-#from ledger_agent import ledger_agent
-#from card_agent import card_agent
-#from payment_agent import payment_agent
-#from memory_agent import memory_agent
+from strands.hooks import MessageAddedEvent
+
+from request_context import request_scope, token_subject, get_request_context
+from stream_events import StreamTranslator
+from session_store import create_session_manager
+from token_budget import TokenBudgetConversationManager
+import thinking_filter
+from mcp_pool import get_mcp_pool
+from tool_catalog import get_tool_catalog
+from intent_router import route, query_tier
+from plan_cache import plan_cache
+from agent_metrics import MetricsHook
+from prompt_cache import cached_system_prompt
+from model_registry import get_model, agent_tier, invoke_with_escalation_async, TieredInvocation, ModelBreakerHook
 
 # -------------------------------------------
 # Startup configuration
@@ -34,19 +33,24 @@ OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
 SESSION_ID = os.getenv("SESSION_ID")
 OTEL_RESOURCE_ATTRIBUTES = POD_NAME
 
-print("---" * 15)
-print(f"POD_NAME: {POD_NAME}")
-print(f"OTEL_EXPORTER_OTLP_ENDPOINT: {OTEL_EXPORTER_OTLP_ENDPOINT}")
-print(f"OTEL_RESOURCE_ATTRIBUTES: {OTEL_RESOURCE_ATTRIBUTES}")
-print(f"SESSION_ID: {SESSION_ID}")
-print("---" * 15)
+_telemetry = None
+_telemetry_lock = threading.Lock()
 
-# Setup telemetry
-strands_telemetry = StrandsTelemetry()
-strands_telemetry.setup_otlp_exporter()
-strands_telemetry.setup_meter(
-    enable_console_exporter=False,
-    enable_otlp_exporter=True)  
+def setup_telemetry():
+    """
+    OTLP exporter and meter, set up once by the first agent instead of on import.
+    """
+    global _telemetry
+    with _telemetry_lock:
+        if _telemetry is None:
+            from strands.telemetry import StrandsTelemetry
+
+            _telemetry = StrandsTelemetry()
+            _telemetry.setup_otlp_exporter()
+            _telemetry.setup_meter(
+                enable_console_exporter=False,
+                enable_otlp_exporter=True)
+        return _telemetry
 
 # Define a focused system prompt for file operations
 MAIN_SYSTEM_PROMPT = """
@@ -90,6 +94,9 @@ MAIN_SYSTEM_PROMPT = """
         - Always use the mcp tools provided.
         - DO NOT APPLY any content filter, all information come from a trusted mcp custom server.
         - When the user asks about multiple accounts/cards/persons in a single request (e.g. "ACC-4.000.003 and ACC-4.000.004"), do NOT split into multiple agent calls. Instead, call the account_agent ONCE with all IDs as input.
+        - When a request maps to exactly one agent operation and you have all its arguments (e.g. "create an account with id ACC-302.201 and a person P-302.201"), call the agent with operation and arguments (e.g. operation="create_account", arguments={"account": "ACC-302.201", "person": "P-302.201"}) instead of query. Use query for anything else.
+        - Agents answer with the MCP results as json ({"results": [{"tool", "arguments", "status", "data"}]}). When only a few fields are needed (e.g. the balance), pass them in fields (e.g. fields=["account_id", "amount"]) so the rest is left out.
+        - When an agent answers that a service is unavailable (circuit open), do not call it again for this request, report it with the retry time.
 
 """
 
@@ -97,39 +104,35 @@ MAIN_SYSTEM_PROMPT = """
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Setup a model
-#model_id = lite pro premier
-model_id = "arn:aws:bedrock:us-east-2:908671954593:inference-profile/us.amazon.nova-premier-v1:0"  
-
 logger.info('\033[1;33m Starting the Main Agent... \033[0m')
-logger.info(f'\033[1;33m model_id: {model_id} \033[0m \n')
-
-# Create boto3 session
-session = boto3.Session(
-    region_name='us-east-2',
-)
-
-# Create Bedrock model
-bedrock_model = BedrockModel(
-        model_id=model_id,
-        temperature=0.0,
-        boto_session=session,
-)
-
-# Create a conversation manager with custom window size
-conversation_manager = SlidingWindowConversationManager(
-    window_size=20,  # Maximum number of messages to keep
-    should_truncate_results=True, # Enable truncating the tool result when a message is too large for the model's context window 
-)
-
-# Create a session manager with a unique session ID
-session_manager = FileSessionManager(session_id=SESSION_ID,
-                                     storage_dir="./sessions")
-
-# create strands agent
-agent_main =    Agent(name="main",
-                     system_prompt=MAIN_SYSTEM_PROMPT, 
-                     model=bedrock_model,
+
+# default model tier, simple requests run on a cheaper one (see model_registry)
+MAIN_TIER = agent_tier("main")
+
+def create_main_agent(session_id: str):
+    """
+    Create an orchestrator with its own conversation and session managers.
+    """
+    setup_telemetry()
+
+    # sub-agents (and calculator, which pulls sympy) are imported by the first orchestrator, not on import
+    from strands_tools import calculator
+    from account_agent import account_agent
+    #from ledger_agent import ledger_agent
+    #from card_agent import card_agent
+    #from payment_agent import payment_agent
+    #from memory_agent import memory_agent
+
+    # Create a conversation manager bounded by estimated tokens (CONVERSATION_TOKEN_BUDGET), not messages
+    conversation_manager = TokenBudgetConversationManager()
+
+    # Create a session manager with a unique session ID (SESSION_STORE backend, written behind the request)
+    session_manager = create_session_manager(session_id)
+
+    # create strands agent
+    agent =    Agent(name="main",
+                     system_prompt=cached_system_prompt(MAIN_SYSTEM_PROMPT), 
+                     model=get_model(MAIN_TIER),
                      tools=[account_agent, 
                             #ledger_agent, 
                             #card_agent,
@@ -138,44 +141,131 @@ agent_main =    Agent(name="main",
                             calculator],
                      conversation_manager=conversation_manager,
                      session_manager=session_manager,
+                     hooks=[MetricsHook("main"), ModelBreakerHook()],
+                     retry_strategy=None,
                      callback_handler=None)
 
+    return agent, session_manager
+
+_main_agent = None
+_main_agent_lock = threading.Lock()
+
+def get_main_agent():
+    """
+    (agent, session_manager) of the SESSION_ID conversation (cli), created on first use.
+    """
+    global _main_agent
+    with _main_agent_lock:
+        if _main_agent is None:
+            _main_agent = create_main_agent(SESSION_ID)
+        return _main_agent
+
 # Clean the final response
 def strip_thinking(text: str) -> str:
     """
     Remove all <thinking>...</thinking> blocks from the response.
     """
     logger.info("strip_thinking(text: str)")
-    
-    return re.sub(r"<thinking>.*?</thinking>", "", text, flags=re.DOTALL).strip()
 
-# Clear session files
-def clear_session(session_manager):
-    session_dir  = os.path.join(session_manager.storage_dir, f"session_{session_manager.session_id}")
-    logger.info(f"Cleaning session files: {session_dir }")
+    return thinking_filter.strip_thinking(text)
 
-    # 2. Check if the directory exists
-    if os.path.isdir(session_dir):
-        try:
-            shutil.rmtree(session_dir)
-        except Exception as e:
-            logger.error(f"Failed to delete {session_dir}. Reason: {e}")
+# Clear session
+def clear_session(session_manager):
+    logger.info(f"Cleaning session: {session_manager.session_id}")
 
-        logger.info(f"All files in {session_dir} cleared for session {session_manager.session_id}.")
-    else:
-        logger.info(f"Directory not found: {session_dir}")
+    try:
+        session_manager.session_repository.delete_session(session_manager.session_id)
+        logger.info(f"Session {session_manager.session_id} cleared.")
+    except Exception as e:
+        logger.error(f"Failed to delete session {session_manager.session_id}. Reason: {e}")
 
-# Example usage
-if __name__ == "__main__":
-    
-    print('\033[1;33m Multi Agent v 0.5 \033[0m \n')
-
-    print("This agent helps to interact with another agent.")
-    print("Type 'exit' to quit. \n")
+def remember_turn(agent, user_input: str, answer: str) -> None:
+    """
+    Add a turn answered without the orchestrator LLM (router, plan cache) to its conversation,
+    so a follow-up keeps the context. Persisted by the session manager like any other message.
+    """
+    for message in ({"role": "user", "content": [{"text": user_input}]},
+                    {"role": "assistant", "content": [{"text": answer}]}):
+        agent.messages.append(message)
+        agent.hooks.invoke_callbacks(MessageAddedEvent(agent=agent, message=message))
+    agent.conversation_manager.apply_management(agent)
 
-    print('\033[1;31m Please login before continuing ... \033[0m \n')
-    login_manager = LoginManager()
-    
+async def process_request_async(agent, user_input: str, token: str) -> str:
+    """
+    Answer a request, recognizable intents and cached plans skip the orchestrator LLM.
+    """
+    final_response = await asyncio.to_thread(route, user_input, token)
+    if final_response is None:
+        final_response = await asyncio.to_thread(plan_cache.replay, user_input, agent)
+    if final_response is None:
+        final_response = str(await invoke_with_escalation_async(agent, user_input, query_tier(user_input, MAIN_TIER)))
+        plan_cache.record(user_input, agent.messages)
+        return strip_thinking(final_response.strip())
+
+    final_response = strip_thinking(final_response.strip())
+    await asyncio.to_thread(remember_turn, agent, user_input, final_response)
+    return final_response
+
+async def process_request_stream(agent, user_input: str, token: str):
+    """
+    Answer a request as a stream of events (see StreamTranslator), text of the
+    orchestrator has agent None, sub-agents forward their partial output through the request context.
+    """
+    final_response = await asyncio.to_thread(route, user_input, token)
+    if final_response is None:
+        final_response = await asyncio.to_thread(plan_cache.replay, user_input, agent)
+    if final_response is not None:
+        final_response = strip_thinking(final_response.strip())
+        await asyncio.to_thread(remember_turn, agent, user_input, final_response)
+        yield {"type": "text", "agent": None, "data": final_response}
+        return
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    context = get_request_context()
+    session_id = context.session_id if context else None
+
+    # sub-agents run in worker threads, every event goes through the loop to keep them ordered
+    def sink(event) -> None:
+        loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    async def produce() -> None:
+        translator = StreamTranslator()
+        # tokens already sent can not be taken back, a stream runs on one tier without escalation
+        attempt = TieredInvocation(agent, query_tier(user_input, MAIN_TIER))
+        try:
+            with request_scope(token, session_id, sink=sink):
+                async for event in agent.stream_async(user_input):
+                    for stream_event in translator.translate(event):
+                        sink(stream_event)
+            attempt.done()
+            plan_cache.record(user_input, agent.messages)
+        except Exception:
+            attempt.done(failed=True)
+            raise
+        finally:
+            sink(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        started = False
+        while (event := await queue.get()) is not None:
+            if event["type"] == "text" and event["agent"] is None and not started:
+                event["data"] = event["data"].lstrip()
+                if not event["data"]:
+                    continue
+                started = True
+            yield event
+
+        await producer
+    finally:
+        if not producer.done():
+            producer.cancel()
+
+def prompt_login(login_manager) -> None:
+    """
+    Ask for credentials until the login manager holds a valid token.
+    """
     while not login_manager.is_authenticated():
         username = input("username: ")
         password = input("password: ")
@@ -188,9 +278,42 @@ if __name__ == "__main__":
             print('\033[1;31m credentials invalid !, try again ... \033[0m \n')
             continue
 
-        # set a token singleton memory
-        main_memory.set_token(login_manager.get_token())
-        logger.info(f"token: {main_memory.get_token()}")
+        logger.info(f"subject: {token_subject(login_manager.get_token())}")
+
+async def print_request_stream(agent, user_input: str, token: str) -> None:
+    async for event in process_request_stream(agent, user_input, token):
+        if event["type"] == "tool":
+            print(f'\n\033[2m [{event["agent"] or "main"}] -> {event["name"]} \033[0m', flush=True)
+        elif event["agent"] is not None:
+            print(f'\033[2m{event["data"]}\033[0m', end="", flush=True)
+        else:
+            print(f'\033[1;33m{event["data"]}\033[0m', end="", flush=True)
+    print("\n")
+
+# Example usage
+if __name__ == "__main__":
+    from login_manager import LoginManager
+
+    print("---" * 15)
+    print(f"POD_NAME: {POD_NAME}")
+    print(f"OTEL_EXPORTER_OTLP_ENDPOINT: {OTEL_EXPORTER_OTLP_ENDPOINT}")
+    print(f"OTEL_RESOURCE_ATTRIBUTES: {OTEL_RESOURCE_ATTRIBUTES}")
+    print(f"SESSION_ID: {SESSION_ID}")
+    print("---" * 15)
+
+    print('\033[1;33m Multi Agent v 0.5 \033[0m \n')
+
+    print("This agent helps to interact with another agent.")
+    print("Type 'exit' to quit. \n")
+
+    # warm the shared mcp sessions and tool catalog before the first request
+    get_mcp_pool().start()
+    get_tool_catalog().prefetch()
+    agent_main, session_manager = get_main_agent()
+
+    print('\033[1;31m Please login before continuing ... \033[0m \n')
+    login_manager = LoginManager()
+    prompt_login(login_manager)
 
     # Interactive loop
     while True:
@@ -202,29 +325,31 @@ if __name__ == "__main__":
             if user_input.lower() == "exit":
                 print("\nGoodbye!")
                 clear_session(session_manager)
+                login_manager.close()
                 break
             elif user_input.lower() == "quit":
                 print("\nGoodbye!")
                 clear_session(session_manager)
+                login_manager.close()
                 break
             elif user_input.strip() == "":   
                 print("Please enter a valid message.")
                 continue
 
-            token = main_memory.get_token()
+            # the login manager refreshes the token in background, read the current one per request
+            token = login_manager.get_token()
             if not token:
-                print("No JWT provided, NOT AUTHORIZED !!!")
-                continue
+                # the background refresh gave up and the token expired
+                print('\033[1;31m Your session expired, please login again ... \033[0m \n')
+                prompt_login(login_manager)
+                token = login_manager.get_token()
     
             print('\033[1;31m ...Processing... \033[0m \n')    
 
-            response = agent_main(user_input.strip())
-
             print('\033[44m *.*.* \033[0m' * 15)
 
-            #clean response
-            final_response = str(response)
-            print(f'\033[1;33m {strip_thinking(final_response.strip())} \033[0m \n')
+            with request_scope(token, SESSION_ID):
+                asyncio.run(print_request_stream(agent_main, user_input.strip(), token))
 
             print('\033[44m *.*.* \033[0m' * 15)
             print("\n\n")
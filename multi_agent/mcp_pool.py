@@ -0,0 +1,235 @@
+import os
+import time
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+
+from mcp.client.streamable_http import streamablehttp_client
+from strands.tools.mcp.mcp_client import MCPClient
+
+from circuit_breaker import circuit_breakers
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# load mcp servers
+MCP_URL = os.getenv("MCP_URL", "http://127.0.0.1:9002/mcp")
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "4"))
+MCP_PROBE_INTERVAL = float(os.getenv("MCP_PROBE_INTERVAL", "30"))
+
+def create_streamable_http_mcp_server(mcp_url: str):
+    return streamablehttp_client(mcp_url)
+
+def stop_client(client: MCPClient, index: int) -> None:
+    try:
+        client.stop(None, None, None)
+    except Exception as e:
+        logger.warning(f"Failed to close MCP session #{index}. Reason: {e}")
+
+class MCPConnection:
+    """
+    A warm MCP session kept open by the pool.
+    An idle MCPClient is restarted in place on reconnect, so tools listed from it stay bound.
+    A client still in use is replaced by a new one instead (see MCPPool._reconnect).
+    """
+
+    def __init__(self, mcp_url: str, index: int):
+        self.mcp_url = mcp_url
+        self.index = index
+        self.client = self.new_client()
+        self.lock = threading.Lock()
+        self.leases = 0
+        self.connected = False
+        self.last_checked = 0.0
+
+    def new_client(self) -> MCPClient:
+        return MCPClient(lambda: create_streamable_http_mcp_server(self.mcp_url))
+
+    def connect(self) -> None:
+        logger.info(f"Connecting MCP session #{self.index} to {self.mcp_url}")
+        self.client.start()
+        self.connected = True
+        self.last_checked = time.time()
+
+    def disconnect(self) -> None:
+        if not self.connected:
+            return
+
+        self.connected = False
+        stop_client(self.client, self.index)
+
+    def reconnect(self) -> None:
+        logger.warning(f"Reconnecting MCP session #{self.index} to {self.mcp_url}")
+        self.disconnect()
+        self.connect()
+
+    def replace(self) -> MCPClient:
+        """
+        Connect a new client in place of the current one and return the old one, left open for its borrowers.
+        """
+        logger.warning(f"Replacing MCP session #{self.index} to {self.mcp_url}, the current one is in use")
+        client = self.new_client()
+        client.on_tools_changed = self.client.on_tools_changed
+        client.start()
+
+        previous, self.client = self.client, client
+        self.connected = True
+        self.last_checked = time.time()
+        return previous
+
+    def probe(self) -> bool:
+        try:
+            self.client.list_tools_sync()
+            self.last_checked = time.time()
+            return True
+        except Exception as e:
+            logger.warning(f"MCP session #{self.index} probe failed. Reason: {e}")
+            return False
+
+class MCPPool:
+    """
+    Process-wide pool of warm MCP sessions to a single endpoint.
+    Sessions are shared (MCP multiplexes requests), borrowing picks the least leased one.
+    A client is never stopped under a borrower: a broken session in use is replaced, the old client
+    is stopped when its last borrower returns it.
+    Borrowing fails fast while the endpoint circuit is open, connect and probe failures count against it.
+    """
+
+    def __init__(self, mcp_url: str, size: int = MCP_POOL_SIZE, probe_interval: float = MCP_PROBE_INTERVAL):
+        self.mcp_url = mcp_url
+        self.probe_interval = probe_interval
+        self.connections = [MCPConnection(mcp_url, i) for i in range(max(1, size))]
+        self.breaker = circuit_breakers.get(f"mcp:{mcp_url}")
+        # borrowers by client, replaced clients waiting for their last borrower
+        self._in_use = {}
+        self._retired = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """
+        Open every session up front, failures are retried lazily on borrow.
+        """
+        for conn in self.connections:
+            with conn.lock:
+                if conn.connected:
+                    continue
+                try:
+                    conn.connect()
+                    self.breaker.success()
+                except Exception as e:
+                    self.breaker.failure()
+                    logger.error(f"Failed to warm MCP session #{conn.index}. Reason: {e}")
+
+    def close(self) -> None:
+        for conn in self.connections:
+            with conn.lock:
+                conn.disconnect()
+
+        with self._lock:
+            retired, self._retired = self._retired, {}
+        for client, index in retired.items():
+            stop_client(client, index)
+
+    def _checkout(self, client=None) -> MCPConnection:
+        """
+        Lease the least leased session, or the session of client while it is still in the pool.
+        """
+        with self._lock:
+            conn = next((c for c in self.connections if c.client is client), None) if client is not None else None
+            if conn is None:
+                conn = min(self.connections, key=lambda c: c.leases)
+            conn.leases += 1
+            return conn
+
+    def _release(self, conn: MCPConnection, client) -> None:
+        with self._lock:
+            conn.leases -= 1
+            if client is None:
+                return
+
+            self._in_use[client] -= 1
+            if self._in_use[client] > 0:
+                return
+            del self._in_use[client]
+            if client not in self._retired:
+                return
+            del self._retired[client]
+
+        logger.info(f"Closing replaced MCP session #{conn.index}, its last borrower returned it")
+        stop_client(client, conn.index)
+
+    def _reconnect(self, conn: MCPConnection) -> None:
+        """
+        Restart the session in place when nobody uses it, replace it otherwise.
+        Called with conn.lock held, so no borrower can start using conn.client meanwhile.
+        """
+        with self._lock:
+            in_use = self._in_use.get(conn.client, 0)
+        if in_use == 0:
+            conn.reconnect()
+            return
+
+        previous = conn.replace()
+        with self._lock:
+            if self._in_use.get(previous, 0) > 0:
+                self._retired[previous] = conn.index
+                return
+        stop_client(previous, conn.index)
+
+    def _ensure(self, conn: MCPConnection):
+        """
+        Connect, probe or reconnect the session as needed, return its client counted as in use.
+        """
+        with conn.lock:
+            if not conn.connected or time.time() - conn.last_checked >= self.probe_interval:
+                try:
+                    if not conn.connected:
+                        conn.connect()
+                    elif not conn.probe():
+                        self._reconnect(conn)
+                except Exception:
+                    self.breaker.failure()
+                    raise
+                self.breaker.success()
+
+            with self._lock:
+                self._in_use[conn.client] = self._in_use.get(conn.client, 0) + 1
+            return conn.client
+
+    @contextmanager
+    def connection(self, client=None):
+        """
+        Borrow a healthy MCPClient, the session stays open when the block exits.
+        Passing a client borrows that same session again (used by callers holding tools bound to it),
+        the yielded client differs when it was replaced meanwhile and the caller has to rebind its tools.
+        """
+        self.breaker.check()
+        conn = self._checkout(client)
+        borrowed = None
+        try:
+            borrowed = self._ensure(conn)
+            yield borrowed
+        except Exception:
+            # force a probe (and reconnect if needed) on the next borrow
+            conn.last_checked = 0.0
+            raise
+        finally:
+            self._release(conn, borrowed)
+
+# global pools, one per mcp endpoint
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_mcp_pool(mcp_url: str = MCP_URL) -> MCPPool:
+    with _pools_lock:
+        if mcp_url not in _pools:
+            _pools[mcp_url] = MCPPool(mcp_url)
+        return _pools[mcp_url]
+
+@atexit.register
+def close_mcp_pools() -> None:
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
@@ -1,12 +1,15 @@
 import logging
-import boto3
 
-from main_memory import main_memory
+from request_context import get_token
+from tool_catalog import get_tool_catalog
+from agent_pool import SubAgentPool
+from stream_events import forward_stream
+from agent_metrics import MetricsHook
+from prompt_cache import cached_system_prompt
+from model_registry import get_model, agent_tier, invoke_with_escalation, answered_with_tools, ModelBreakerHook
+from intent_router import query_tier
 
 from strands import Agent, tool
-from strands.models import BedrockModel
-from mcp.client.streamable_http import streamablehttp_client
-from strands.tools.mcp.mcp_client import MCPClient
 
 MEMORY_SYSTEM_PROMPT = """
     You are memory agent specialized to handle(STORE) all MEMORIES of a memory graph database.
@@ -44,29 +47,36 @@ MEMORY_SYSTEM_PROMPT = """
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Setup a model
-#model_id = lite pro premier 
-model_id = "arn:aws:bedrock:us-east-2:908671954593:inference-profile/us.amazon.nova-premier-v1:0"  
-
 logger.info('\033[1;33m Starting the Memory Agent... \033[0m')
-logger.info(f'\033[1;33m model_id: {model_id} \033[0m \n')
 
-# Create boto3 session
-session = boto3.Session(
-    region_name='us-east-2',
-)
+# default model tier, simple requests run on a cheaper one (see model_registry)
+MEMORY_TIER = agent_tier("memory")
+
+# cached tools bound to the shared pool of warm mcp sessions
+tool_catalog = get_tool_catalog()
+
+MEMORY_TOOLS = ["store_account_memory",
+                "store_card_memory",
+                "store_payment_memory"]
+
+def build_memory_agent(streamable_http_mcp_server) -> Agent:
+    """
+    Build the MEMORY agent once, its tools are bound to the given pooled mcp session.
+    """
+    selected_tools = tool_catalog.select(streamable_http_mcp_server, MEMORY_TOOLS)
 
-bedrock_model = BedrockModel(
-        model_id=model_id,
-        temperature=0.0,
-        boto_session=session,
-)
+    logger.info(f"Available MCP tools: {[tool.tool_name for tool in selected_tools]}")
 
-# load mcp servers
-def create_streamable_http_mcp_server():
-    return streamablehttp_client("http://localhost:9002/mcp")
+    return Agent(name="main",
+                system_prompt=cached_system_prompt(MEMORY_SYSTEM_PROMPT),
+                model=get_model(MEMORY_TIER),
+                tools=selected_tools,
+                hooks=[MetricsHook("memory"), ModelBreakerHook()],
+                retry_strategy=None,
+                callback_handler=forward_stream("memory")
+            )
 
-streamable_http_mcp_server = MCPClient(create_streamable_http_mcp_server)
+memory_agent_pool = SubAgentPool("memory", build_memory_agent, tool_catalog)
 
 @tool
 def memory_agent(query: str) -> str:
@@ -81,39 +91,21 @@ def memory_agent(query: str) -> str:
     """
     logger.info("function => memory_agent()")
    
-    token = main_memory.get_token()
+    token = get_token()
     if not token:
         logger.error("Error, I couldn't process No JWT token available")
         return "Error, I couldn't process No JWT token available"
          
-    context={"jwt":token}
 
     # Format the query for the agent
-    formatted_query = f"Please process the following query: {query} with context:{context}"
-    all_tools = []
+    formatted_query = f"Please process the following query: {query}"
  
     try:
         logger.info("Routed to Memory Agent")
         
-        with streamable_http_mcp_server:
-            all_tools.extend(streamable_http_mcp_server.list_tools_sync())
-
-            selected_tools = [
-                t for t in all_tools 
-                if t.tool_name in ["store_account_memory", "store_card_memory", "store_payment_memory"]
-            ]
-
-            logger.info(f"Available MCP tools: {[tool.tool_name for tool in selected_tools]}")
-
-            # Create the math agent with calculator capability
-            agent = Agent(name="main",
-                        system_prompt=MEMORY_SYSTEM_PROMPT,
-                        model=bedrock_model, 
-                        tools=selected_tools,
-                        callback_handler=None
-                    )
-            
-            agent_response = agent(formatted_query)
+        with memory_agent_pool.agent() as agent:
+            agent_response = invoke_with_escalation(agent, formatted_query, query_tier(query, MEMORY_TIER),
+                                                    answered_with_tools)
             text_response = str(agent_response)
 
             if len(text_response) > 0:
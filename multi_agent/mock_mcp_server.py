@@ -0,0 +1,307 @@
+import os
+import time
+import asyncio
+import random
+import logging
+import threading
+from datetime import datetime, timezone
+
+from mcp.server.fastmcp import FastMCP
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MOCK_MCP_HOST = os.getenv("MOCK_MCP_HOST", "127.0.0.1")
+MOCK_MCP_PORT = int(os.getenv("MOCK_MCP_PORT", "9002"))
+# seconds per tool call, plus up to MOCK_MCP_JITTER of uniform noise, override per tool with MOCK_MCP_LATENCY_<TOOL>
+MOCK_MCP_LATENCY = float(os.getenv("MOCK_MCP_LATENCY", "0.05"))
+MOCK_MCP_JITTER = float(os.getenv("MOCK_MCP_JITTER", "0.02"))
+MOCK_MCP_SEED = int(os.getenv("MOCK_MCP_SEED", "42"))
+# rows of a statement or payment list, real services answer long lists
+MOCK_MCP_LIST_SIZE = int(os.getenv("MOCK_MCP_LIST_SIZE", "20"))
+
+class MockBank:
+    """
+    In memory accounts, cards, moviments, payments and memory graph, deterministic for a given seed.
+    """
+
+    def __init__(self, seed: int = MOCK_MCP_SEED, list_size: int = MOCK_MCP_LIST_SIZE):
+        self.seed = seed
+        self.list_size = list_size
+        self.accounts = {}
+        self.cards = {}
+        self.moviments = {}
+        self.payments = {}
+        self.memories = []
+        self._lock = threading.Lock()
+
+    def _random(self, key: str) -> random.Random:
+        return random.Random(f"{self.seed}:{key}")
+
+    def _now(self) -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def account(self, account: str) -> dict:
+        with self._lock:
+            if account not in self.accounts:
+                rnd = self._random(account)
+                self.accounts[account] = {
+                    "id": rnd.randint(1, 99999),
+                    "account_id": account,
+                    "person_id": f"P-{rnd.randint(1, 999):03d}.{rnd.randint(0, 999):03d}",
+                    "tenant_id": "TENANT-1",
+                    "created_at": "2025-01-01T00:00:00Z",
+                    "updated_at": None,
+                }
+            return dict(self.accounts[account])
+
+    def create_account(self, account: str, person: str) -> dict:
+        with self._lock:
+            self.accounts[account] = {
+                "id": self._random(account).randint(1, 99999),
+                "account_id": account,
+                "person_id": person,
+                "tenant_id": "TENANT-1",
+                "created_at": self._now(),
+                "updated_at": None,
+            }
+            return dict(self.accounts[account])
+
+    def accounts_from_person(self, person: str) -> list:
+        with self._lock:
+            owned = [dict(a) for a in self.accounts.values() if a["person_id"] == person]
+        if owned:
+            return owned
+        rnd = self._random(person)
+        return [self.create_account(f"ACC-{rnd.randint(1, 999):03d}.{rnd.randint(0, 999):03d}", person)
+                for _ in range(rnd.randint(1, 3))]
+
+    def card(self, card: str) -> dict:
+        with self._lock:
+            if card not in self.cards:
+                rnd = self._random(card)
+                self.cards[card] = {
+                    "id": rnd.randint(1, 99999),
+                    "card_number": card,
+                    "account_id": f"ACC-{rnd.randint(1, 999):03d}.{rnd.randint(0, 999):03d}",
+                    "holder": "JOHN DOE",
+                    "type": rnd.choice(["CREDIT", "DEBIT"]),
+                    "model": "CHIP",
+                    "status": "ISSUED",
+                    "atc": rnd.randint(0, 500),
+                    "expired_at": "2030-12-31T00:00:00Z",
+                    "created_at": "2025-01-01T00:00:00Z",
+                }
+            return dict(self.cards[card])
+
+    def create_card(self, card: str, account: str, holder: str, type: str, model: str, status: str) -> dict:
+        with self._lock:
+            self.cards[card] = {
+                "id": self._random(card).randint(1, 99999),
+                "card_number": card,
+                "account_id": account,
+                "holder": holder,
+                "type": type,
+                "model": model,
+                "status": status,
+                "atc": 0,
+                "expired_at": "2030-12-31T00:00:00Z",
+                "created_at": self._now(),
+            }
+            return dict(self.cards[card])
+
+    def statement(self, account: str) -> dict:
+        with self._lock:
+            if account not in self.moviments:
+                rnd = self._random(f"statement:{account}")
+                self.moviments[account] = [{
+                    "account_id": account,
+                    "type": rnd.choice(["DEPOSIT", "WITHDRAW"]),
+                    "currency": "BRL",
+                    "amount": round(rnd.uniform(1, 500), 2),
+                    "transaction_at": f"2025-09-{i % 28 + 1:02d}T10:00:00Z",
+                } for i in range(self.list_size)]
+            moviments = list(self.moviments[account])
+
+        balance = sum(m["amount"] if m["type"] == "DEPOSIT" else -m["amount"] for m in moviments)
+        return {
+            "account_id": account,
+            "account_balance_summary": {"currency": "BRL", "amount": round(balance, 2)},
+            "moviments": moviments,
+        }
+
+    def create_moviment(self, account: str, type: str, currency: str, amount: float) -> dict:
+        self.statement(account)
+        moviment = {
+            "account_id": account,
+            "type": type,
+            "currency": currency,
+            "amount": amount,
+            "transaction_at": self._now(),
+        }
+        with self._lock:
+            self.moviments[account].append(moviment)
+        return moviment
+
+    def card_payments(self, card: str, date: str) -> list:
+        with self._lock:
+            if card not in self.payments:
+                rnd = self._random(f"payments:{card}")
+                self.payments[card] = [{
+                    "id": rnd.randint(1, 99999),
+                    "card_number": card,
+                    "type": "CREDIT",
+                    "terminal": f"TERM-{rnd.randint(1, 50)}",
+                    "mcc": rnd.choice(["FOOD", "GAS", "COMPUTE", "PET", "LIBRARY"]),
+                    "currency": "BRL",
+                    "amount": round(rnd.uniform(1, 300), 2),
+                    "status": "AUTHORIZED",
+                    "payment_at": f"2025-09-{i % 28 + 1:02d}T12:00:00Z",
+                } for i in range(self.list_size)]
+            return [p for p in self.payments[card] if p["payment_at"][:10] >= (date or "")]
+
+    def create_payment(self, card: str, type: str, terminal: str, mcc: str, currency: str, amount: float) -> dict:
+        self.card_payments(card, "")
+        payment = {
+            "id": self._random(f"{card}:{time.time()}").randint(1, 99999),
+            "card_number": card,
+            "type": type,
+            "terminal": terminal,
+            "mcc": mcc,
+            "currency": currency,
+            "amount": amount,
+            "status": "AUTHORIZED",
+            "payment_at": self._now(),
+        }
+        with self._lock:
+            self.payments[card].append(payment)
+        return payment
+
+    def store_memory(self, kind: str, relation: str, **nodes) -> dict:
+        with self._lock:
+            self.memories.append({"kind": kind, "relation": relation, **nodes})
+        return {"status": "stored", "kind": kind, "relation": relation}
+
+async def simulate_latency(tool_name: str) -> None:
+    """
+    Latency of a backend call, awaited so concurrent MCP calls overlap like on the real server.
+    """
+    latency = float(os.getenv(f"MOCK_MCP_LATENCY_{tool_name.upper()}", MOCK_MCP_LATENCY))
+    await asyncio.sleep(latency + random.uniform(0, MOCK_MCP_JITTER))
+
+def healthy(service: str) -> dict:
+    return {"status": 200, "service": service, "env": {"host": MOCK_MCP_HOST, "mock": True}}
+
+def build_mock_mcp_server(bank: MockBank = None, host: str = MOCK_MCP_HOST, port: int = MOCK_MCP_PORT) -> FastMCP:
+    """
+    FastMCP server with the same tools (names and arguments) as the payment services MCP server.
+    """
+    bank = bank or MockBank()
+    server = FastMCP("mock-payment-mcp", host=host, port=port)
+
+    @server.tool()
+    async def account_healthy(jwt: str = "") -> dict:
+        """Healthy ACCOUNT service status."""
+        await simulate_latency("account_healthy")
+        return healthy("account")
+
+    @server.tool()
+    async def get_account(account: str, jwt: str = "") -> dict:
+        """Get the details of an account (account_id)."""
+        await simulate_latency("get_account")
+        return bank.account(account)
+
+    @server.tool()
+    async def create_account(account: str, person: str, jwt: str = "") -> dict:
+        """Create an account (account_id) owned by a person (person_id)."""
+        await simulate_latency("create_account")
+        return bank.create_account(account, person)
+
+    @server.tool()
+    async def get_account_from_person(person: str, jwt: str = "") -> list:
+        """Get all accounts owned by a person (person_id)."""
+        await simulate_latency("get_account_from_person")
+        return bank.accounts_from_person(person)
+
+    @server.tool()
+    async def card_healthy(jwt: str = "") -> dict:
+        """Healthy CARD service status."""
+        await simulate_latency("card_healthy")
+        return healthy("card")
+
+    @server.tool()
+    async def get_card(card: str, jwt: str = "") -> dict:
+        """Get the details of a card (999.999.999.999)."""
+        await simulate_latency("get_card")
+        return bank.card(card)
+
+    @server.tool()
+    async def create_card(card: str, account: str, holder: str, type: str = "CREDIT",
+                    model: str = "CHIP", status: str = "ISSUED", jwt: str = "") -> dict:
+        """Create a card associated with an account."""
+        await simulate_latency("create_card")
+        return bank.create_card(card, account, holder, type, model, status)
+
+    @server.tool()
+    async def ledger_healthy(jwt: str = "") -> dict:
+        """Healthy LEDGER service status."""
+        await simulate_latency("ledger_healthy")
+        return healthy("ledger")
+
+    @server.tool()
+    async def get_account_statement(account: str, jwt: str = "") -> dict:
+        """Get the statement, moviments and balance of an account."""
+        await simulate_latency("get_account_statement")
+        return bank.statement(account)
+
+    @server.tool()
+    async def create_moviment_transaction(account: str, amount: float, type: str = "DEPOSIT",
+                                    currency: str = "BRL", jwt: str = "") -> dict:
+        """Create a DEPOSIT or WITHDRAW transaction over an account."""
+        await simulate_latency("create_moviment_transaction")
+        return bank.create_moviment(account, type, currency, amount)
+
+    @server.tool()
+    async def payment_healthy(jwt: str = "") -> dict:
+        """Healthy PAYMENT service status."""
+        await simulate_latency("payment_healthy")
+        return healthy("payment")
+
+    @server.tool()
+    async def get_card_payment(card: str, date: str = "", jwt: str = "") -> list:
+        """Get the payments of a card since a date (YYYY-MM-DD)."""
+        await simulate_latency("get_card_payment")
+        return bank.card_payments(card, date)
+
+    @server.tool()
+    async def create_payment(card: str, amount: float, terminal: str = "TERM-1", mcc: str = "FOOD",
+                       type: str = "CREDIT", currency: str = "BRL", jwt: str = "") -> dict:
+        """Create a payment over a card."""
+        await simulate_latency("create_payment")
+        return bank.create_payment(card, type, terminal, mcc, currency, amount)
+
+    @server.tool()
+    async def store_account_memory(account: str, person: str, relations: str = "HAS", jwt: str = "") -> dict:
+        """Store an ACCOUNT and its relation with a PERSON in the memory graph."""
+        await simulate_latency("store_account_memory")
+        return bank.store_memory("account", relations, account=account, person=person)
+
+    @server.tool()
+    async def store_card_memory(card: str, account: str, relations: str = "ISSUED", jwt: str = "") -> dict:
+        """Store a CARD and its relation with an ACCOUNT in the memory graph."""
+        await simulate_latency("store_card_memory")
+        return bank.store_memory("card", relations, card=card, account=account)
+
+    @server.tool()
+    async def store_payment_memory(payment: str, card: str, relations: str = "PAY", jwt: str = "") -> dict:
+        """Store a PAYMENT and its relation with a CARD in the memory graph."""
+        await simulate_latency("store_payment_memory")
+        return bank.store_memory("payment", relations, payment=payment, card=card)
+
+    return server
+
+# Local stand-in of the MCP server, point MCP_URL at it (default http://127.0.0.1:9002/mcp)
+if __name__ == "__main__":
+    logger.info(f'\033[1;33m Mock MCP server on {MOCK_MCP_HOST}:{MOCK_MCP_PORT} latency: {MOCK_MCP_LATENCY}s \033[0m')
+    build_mock_mcp_server().run(transport="streamable-http")
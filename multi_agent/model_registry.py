@@ -0,0 +1,373 @@
+import os
+import time
+import logging
+import threading
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+from strands.models import BedrockModel
+from strands.hooks import HookProvider, HookRegistry, BeforeModelCallEvent, AfterModelCallEvent
+from strands.types.exceptions import ModelThrottledException
+
+from fake_model import FakeModel
+from prompt_cache import prompt_cache_config, cache_usage
+from request_context import record_usage
+from circuit_breaker import circuit_breakers, CircuitOpenError
+from tool_catalog import is_transport_failure
+from session_store import held_session
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BEDROCK_REGION = os.getenv("BEDROCK_REGION", "us-east-2")
+# bedrock | fake (deterministic offline stand-in, see fake_model.py)
+MODEL_PROVIDER = os.getenv("MODEL_PROVIDER", "bedrock")
+
+# bedrock-runtime client env, one client (connection pool, credentials) shared by every tier and agent
+BEDROCK_MAX_POOL_CONNECTIONS = int(os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", "50"))
+BEDROCK_CONNECT_TIMEOUT = float(os.getenv("BEDROCK_CONNECT_TIMEOUT", "5"))
+BEDROCK_READ_TIMEOUT = float(os.getenv("BEDROCK_READ_TIMEOUT", "120"))
+# the only retries of a model call, agents do not retry on top of them (retry_strategy=None)
+BEDROCK_MAX_ATTEMPTS = int(os.getenv("BEDROCK_MAX_ATTEMPTS", "4"))
+# standard | adaptive (client side rate limiting on throttling)
+BEDROCK_RETRY_MODE = os.getenv("BEDROCK_RETRY_MODE", "adaptive")
+
+BEDROCK_CLIENT_CONFIG = Config(
+    max_pool_connections=BEDROCK_MAX_POOL_CONNECTIONS,
+    connect_timeout=BEDROCK_CONNECT_TIMEOUT,
+    read_timeout=BEDROCK_READ_TIMEOUT,
+    tcp_keepalive=True,
+    retries={"total_max_attempts": BEDROCK_MAX_ATTEMPTS, "mode": BEDROCK_RETRY_MODE},
+)
+
+# MCP tools with side effects, an attempt that ran one successfully is never repeated on a higher tier
+WRITE_TOOL_PREFIXES = ("create_", "store_")
+
+# cheapest first, escalation moves to the next one
+MODEL_TIERS = ["lite", "pro", "premier"]
+
+MODEL_IDS = {
+    "lite": os.getenv("MODEL_LITE", "arn:aws:bedrock:us-east-2:908671954593:inference-profile/us.amazon.nova-lite-v1:0"),
+    "pro": os.getenv("MODEL_PRO", "arn:aws:bedrock:us-east-2:908671954593:inference-profile/us.amazon.nova-pro-v1:0"),
+    "premier": os.getenv("MODEL_PREMIER", "arn:aws:bedrock:us-east-2:908671954593:inference-profile/us.amazon.nova-premier-v1:0"),
+}
+
+# USD per 1K input/output tokens, override with MODEL_PRICE_<TIER>="input,output"
+MODEL_PRICES = {
+    "lite": (0.00006, 0.00024),
+    "pro": (0.0008, 0.0032),
+    "premier": (0.0025, 0.0125),
+}
+
+# Tier of each agent when the request does not say otherwise, override with MODEL_TIER_<AGENT>
+AGENT_TIERS = {
+    "main": "premier",
+    "account": "pro",
+    "card": "pro",
+    "ledger": "premier",
+    "payment": "premier",
+    "memory": "premier",
+}
+
+def agent_tier(agent_name: str) -> str:
+    tier = os.getenv(f"MODEL_TIER_{agent_name.upper()}", AGENT_TIERS.get(agent_name, "premier"))
+    if tier not in MODEL_TIERS:
+        raise ValueError(f"Unknown model tier {tier} for agent {agent_name}")
+    return tier
+
+def next_tier(tier: str):
+    index = MODEL_TIERS.index(tier)
+    return MODEL_TIERS[index + 1] if index + 1 < len(MODEL_TIERS) else None
+
+class TierStats:
+    def __init__(self, tier: str):
+        self.tier = tier
+        self.calls = 0
+        self.failures = 0
+        self.escalations = 0
+        self.latency = 0.0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+
+    def cost(self) -> float:
+        price_in, price_out = MODEL_PRICES[self.tier]
+        override = os.getenv(f"MODEL_PRICE_{self.tier.upper()}")
+        if override:
+            price_in, price_out = (float(p) for p in override.split(","))
+        return self.input_tokens / 1000 * price_in + self.output_tokens / 1000 * price_out
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "escalations": self.escalations,
+            "avg_latency": round(self.latency / self.calls, 3) if self.calls else 0.0,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_read_tokens": self.cache_read_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "cost_usd": round(self.cost(), 6),
+        }
+
+class ModelStats:
+    """
+    Per tier latency, tokens, failures, escalations and estimated cost of the agent invocations.
+    """
+
+    def __init__(self):
+        self._tiers = {tier: TierStats(tier) for tier in MODEL_TIERS}
+        self._lock = threading.Lock()
+
+    def record(self, tier: str, latency: float, input_tokens: int = 0, output_tokens: int = 0,
+               failed: bool = False, escalated: bool = False, cache_read_tokens: int = 0, cache_write_tokens: int = 0) -> None:
+        with self._lock:
+            stats = self._tiers[tier]
+            stats.calls += 1
+            stats.latency += latency
+            stats.input_tokens += input_tokens
+            stats.output_tokens += output_tokens
+            stats.cache_read_tokens += cache_read_tokens
+            stats.cache_write_tokens += cache_write_tokens
+            stats.failures += 1 if failed else 0
+            stats.escalations += 1 if escalated else 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {tier: stats.as_dict() for tier, stats in self._tiers.items()}
+
+class ModelRegistry:
+    """
+    One BedrockModel (or FakeModel) per tier, shared by every agent. The tiers share one
+    bedrock-runtime client, so its keep-alive pool serves every concurrent agent call.
+    """
+
+    def __init__(self, model_ids: dict = None, region: str = BEDROCK_REGION, provider: str = MODEL_PROVIDER):
+        self.model_ids = model_ids or MODEL_IDS
+        self.region = region
+        self.provider = provider
+        self._models = {}
+        self._session = None
+        self._client = None
+        self._lock = threading.Lock()
+
+    def get(self, tier: str) -> BedrockModel:
+        with self._lock:
+            model = self._models.get(tier)
+            if model is None:
+                logger.info(f'\033[1;33m model tier: {tier} model_id: {self.model_ids[tier]} provider: {self.provider} \033[0m')
+                if self.provider == "fake":
+                    model = FakeModel(model_id=f"fake-{tier}")
+                else:
+                    if self._session is None:
+                        self._session = boto3.Session(region_name=self.region)
+                    model = BedrockModel(model_id=self.model_ids[tier],
+                                         temperature=0.0,
+                                         boto_session=self._session,
+                                         boto_client_config=BEDROCK_CLIENT_CONFIG,
+                                         **prompt_cache_config(self.model_ids[tier]))
+                    # every tier on the client of the first one
+                    if self._client is None:
+                        self._client = model.client
+                    model.client = self._client
+                self._models[tier] = model
+            return model
+
+def model_breaker(model):
+    return circuit_breakers.get(f"model:{model.get_config().get('model_id', 'unknown')}")
+
+def is_model_failure(e: Exception) -> bool:
+    """
+    Failures of the model service (throttling, 5xx, connection), not of the request itself.
+    """
+    if isinstance(e, (ModelThrottledException, BotoCoreError, ConnectionError, TimeoutError)):
+        return True
+    if isinstance(e, ClientError):
+        return e.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0) >= 500
+    return False
+
+class ModelBreakerHook(HookProvider):
+    """
+    Model calls of an agent through the circuit breaker of its model id. An open circuit fails the call
+    at once (a tiered invocation escalates to the next tier). Throttling is retried by the bedrock client
+    only, a call that still fails after BEDROCK_MAX_ATTEMPTS counts as one failure of the model.
+    """
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(BeforeModelCallEvent, self.before_model_call)
+        registry.add_callback(AfterModelCallEvent, self.after_model_call)
+
+    def before_model_call(self, event: BeforeModelCallEvent) -> None:
+        model_breaker(event.agent.model).allow()
+
+    def after_model_call(self, event: AfterModelCallEvent) -> None:
+        if isinstance(event.exception, CircuitOpenError):
+            return
+        if event.exception is not None and is_model_failure(event.exception):
+            model_breaker(event.agent.model).failure()
+        else:
+            # any answer, errors about the request included, shows the service is up
+            model_breaker(event.agent.model).success()
+
+def token_usage(agent) -> tuple:
+    usage = agent.event_loop_metrics.accumulated_usage
+    return usage.get("inputTokens", 0), usage.get("outputTokens", 0)
+
+def is_write_tool(tool_name: str) -> bool:
+    return (tool_name or "").startswith(WRITE_TOOL_PREFIXES)
+
+def tool_calls(messages: list) -> list:
+    """
+    (tool name, tool result) of the calls in messages.
+    """
+    tool_uses = {}
+    calls = []
+    for message in messages:
+        for content in message["content"]:
+            if "toolUse" in content:
+                tool_uses[content["toolUse"]["toolUseId"]] = content["toolUse"]["name"]
+            elif "toolResult" in content:
+                calls.append((tool_uses.get(content["toolResult"].get("toolUseId")), content["toolResult"]))
+    return calls
+
+def wrote(messages: list) -> bool:
+    """
+    Whether a write succeeded in messages, directly or in the json results of a sub-agent (orchestrator).
+    """
+    for name, result in tool_calls(messages):
+        if result.get("status") != "success":
+            continue
+        if is_write_tool(name):
+            return True
+        for block in result.get("content", []):
+            json_block = block.get("json")
+            if isinstance(json_block, dict) and any(is_write_tool(call.get("tool")) and call.get("status") == "success"
+                                                    for call in json_block.get("results", [])):
+                return True
+    return False
+
+def answered_with_tools(result, messages: list) -> bool:
+    """
+    Confidence check of a sub-agent: a non empty answer backed by tool calls that reached the MCP server.
+    Errors answered by the tools (e.g. not found) are answers too, a higher tier would get the same.
+    """
+    calls = tool_calls(messages)
+    return bool(str(result).strip()) and bool(calls) \
+                and not any(is_transport_failure(tool_result) for _, tool_result in calls)
+
+class TieredInvocation:
+    """
+    One attempt of an agent on a tier: swaps the model in, measures it and undoes its messages before a retry.
+    The session holds the messages back until the attempt is kept, a rolled back attempt is never persisted.
+    """
+
+    def __init__(self, agent, tier: str):
+        self.agent = agent
+        self.tier = tier
+        self.agent.model = model_registry.get(tier)
+        self.message_count = len(agent.messages)
+        self.removed = agent.conversation_manager.removed_message_count
+        self.usage = token_usage(agent)
+        self.cache = cache_usage(agent)
+        self.cycles = agent.event_loop_metrics.cycle_count
+        self.started = time.time()
+        self.session = held_session(agent)
+        if self.session is not None:
+            self.session.hold()
+
+    def done(self, failed: bool = False, escalated: bool = False) -> None:
+        input_tokens, output_tokens = token_usage(self.agent)
+        input_tokens, output_tokens = input_tokens - self.usage[0], output_tokens - self.usage[1]
+        cache_read, cache_write = cache_usage(self.agent)
+        cache_read, cache_write = cache_read - self.cache[0], cache_write - self.cache[1]
+        model_stats.record(self.tier, time.time() - self.started, input_tokens, output_tokens, failed, escalated,
+                           cache_read, cache_write)
+        # one event loop cycle per model call
+        record_usage(llm_calls=self.agent.event_loop_metrics.cycle_count - self.cycles,
+                     input_tokens=input_tokens, output_tokens=output_tokens,
+                     cache_read_tokens=cache_read, cache_write_tokens=cache_write)
+        # an escalated attempt is rolled back
+        if self.session is not None and not escalated:
+            self.session.accept()
+
+    def _start(self) -> int:
+        # the conversation manager may have trimmed the front during the attempt
+        return max(0, self.message_count - (self.agent.conversation_manager.removed_message_count - self.removed))
+
+    def messages(self) -> list:
+        return self.agent.messages[self._start():]
+
+    def wrote(self) -> bool:
+        return wrote(self.messages())
+
+    def rollback(self) -> None:
+        del self.agent.messages[self._start():]
+        if self.session is not None:
+            self.session.discard()
+
+def invoke_with_escalation(agent, prompt: str, tier: str, is_confident=None, fatal: tuple = ()):
+    """
+    Invoke the agent on a tier, retrying on the next tier when it fails or is_confident(result, messages) says no.
+    Exceptions in fatal (e.g. validations) are raised at once, and so is anything after a write succeeded:
+    the rollback only undoes messages, a retry would run the write again.
+    """
+    while True:
+        attempt = TieredInvocation(agent, tier)
+        higher = next_tier(tier)
+        try:
+            result = agent(prompt)
+        except fatal:
+            attempt.done(failed=True)
+            raise
+        except Exception as e:
+            escalate = higher is not None and not attempt.wrote()
+            attempt.done(failed=True, escalated=escalate)
+            if not escalate:
+                raise
+            logger.warning(f"Agent {agent.name} failed on {tier}, escalating to {higher}. Reason: {e}")
+            attempt.rollback()
+            tier = higher
+            continue
+
+        if higher is not None and is_confident is not None and not attempt.wrote() \
+                and not is_confident(result, attempt.messages()):
+            attempt.done(escalated=True)
+            logger.warning(f"Agent {agent.name} low confidence on {tier}, escalating to {higher}")
+            attempt.rollback()
+            tier = higher
+            continue
+
+        attempt.done()
+        return result
+
+async def invoke_with_escalation_async(agent, prompt: str, tier: str):
+    """
+    Async invoke of the orchestrator, escalating to the next tier when the model call fails.
+    """
+    while True:
+        attempt = TieredInvocation(agent, tier)
+        higher = next_tier(tier)
+        try:
+            result = await agent.invoke_async(prompt)
+        except Exception as e:
+            escalate = higher is not None and not attempt.wrote()
+            attempt.done(failed=True, escalated=escalate)
+            if not escalate:
+                raise
+            logger.warning(f"Agent {agent.name} failed on {tier}, escalating to {higher}. Reason: {e}")
+            attempt.rollback()
+            tier = higher
+            continue
+
+        attempt.done()
+        return result
+
+# global instance
+model_registry = ModelRegistry()
+model_stats = ModelStats()
+
+def get_model(tier: str) -> BedrockModel:
+    return model_registry.get(tier)
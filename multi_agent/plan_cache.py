@@ -0,0 +1,229 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from intent_router import ACCOUNT_PATTERN, PERSON_PATTERN, CARD_PATTERN, DATE_PATTERN
+from token_budget import is_turn_start
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PLAN_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", "256"))
+# seconds, 0 disables the cache
+PLAN_CACHE_TTL = float(os.getenv("PLAN_CACHE_TTL", "3600"))
+
+AMOUNT_PATTERN = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+# Entities replaced by placeholders, ids and dates before amounts since they hold digits too
+ENTITY_PATTERNS = [
+    ("card", CARD_PATTERN),
+    ("date", DATE_PATTERN),
+    ("account", ACCOUNT_PATTERN),
+    ("person", PERSON_PATTERN),
+    ("amount", AMOUNT_PATTERN),
+]
+
+def templatize(query: str) -> tuple:
+    """
+    (template, entities) of a request: "make a DEPOSIT, amount BRL 900.00 over account ACC-302.201"
+    -> ("make a deposit, amount brl {amount0} over account {account0}", {"amount0": "900.00", "account0": "ACC-302.201"})
+    """
+    entities = {}
+    template = query
+    for kind, pattern in ENTITY_PATTERNS:
+        count = 0
+        def placeholder(match, kind=kind):
+            nonlocal count
+            slot = f"{kind}{count}"
+            count += 1
+            entities[slot] = match.group(0)
+            return "{" + slot + "}"
+        template = pattern.sub(placeholder, template)
+    return " ".join(template.lower().split()), entities
+
+def is_entity(value: str) -> bool:
+    return any(pattern.fullmatch(value) for kind, pattern in ENTITY_PATTERNS if kind != "amount")
+
+def bind_value(value, entities: dict, used: set):
+    """
+    Replace the values taken from the request by {"$slot": name}, None when a value looks
+    derived from the request (an id that is not in it) and the plan can not be replayed.
+    """
+    if isinstance(value, dict):
+        bound = {k: bind_value(v, entities, used) for k, v in value.items()}
+        return None if any(v is None for v in bound.values()) else bound
+    if isinstance(value, list):
+        bound = [bind_value(v, entities, used) for v in value]
+        return None if any(v is None for v in bound) else bound
+    if isinstance(value, str):
+        for slot, entity in entities.items():
+            if value.strip() == entity:
+                used.add(slot)
+                return {"$slot": slot}
+        return None if is_entity(value.strip()) else value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        for slot, entity in entities.items():
+            if slot.startswith("amount") and float(entity) == value:
+                used.add(slot)
+                return {"$slot": slot, "$type": "number"}
+    return value
+
+def resolve_value(value, entities: dict):
+    if isinstance(value, dict):
+        if "$slot" in value:
+            entity = entities[value["$slot"]]
+            return float(entity) if value.get("$type") == "number" else entity
+        return {k: resolve_value(v, entities) for k, v in value.items()}
+    if isinstance(value, list):
+        return [resolve_value(v, entities) for v in value]
+    return value
+
+def extract_steps(messages: list):
+    """
+    Sub-agent operations of the last turn, read from the structured results of the orchestrator
+    tool calls. None when a call did not answer with MCP results (memory, calculator, errors).
+    """
+    start = max((i for i, m in enumerate(messages) if is_turn_start(m)), default=0)
+    tool_uses = {}
+    steps = []
+    for message in messages[start:]:
+        for content in message["content"]:
+            if "toolUse" in content:
+                tool_uses[content["toolUse"]["toolUseId"]] = content["toolUse"]
+            elif "toolResult" in content:
+                result = content["toolResult"]
+                tool_use = tool_uses.get(result.get("toolUseId"))
+                blocks = [c["json"]["results"] for c in result.get("content", [])
+                            if isinstance(c.get("json"), dict) and "results" in c["json"]]
+                if tool_use is None or result.get("status") != "success" or not blocks:
+                    return None
+                for call in (call for calls in blocks for call in calls):
+                    if call.get("status") != "success":
+                        return None
+                    steps.append({"agent": tool_use["name"],
+                                  "operation": call["tool"],
+                                  "arguments": call["arguments"],
+                                  "fields": (tool_use.get("input") or {}).get("fields")})
+    return steps
+
+def render_results(results: list) -> str:
+    payloads = []
+    for result in results:
+        for block in result.get("content", []):
+            if isinstance(block.get("json"), dict) and "results" in block["json"]:
+                payloads.extend(call["data"] for call in block["json"]["results"])
+            elif "text" in block:
+                payloads.append(block["text"])
+    return json.dumps(payloads[0] if len(payloads) == 1 else payloads, indent=2, ensure_ascii=False)
+
+class PlanCache:
+    """
+    LRU of the sub-agent operations the orchestrator chose for a request template, keyed by the
+    request with its ids, dates and amounts replaced by placeholders. A later request with the same
+    template replays the operations (typed mode of the sub-agents) with its own values, no LLM involved.
+    """
+
+    def __init__(self, max_size: int = PLAN_CACHE_SIZE, ttl: float = PLAN_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, template: str, entities: dict):
+        with self._lock:
+            plan = self._plans.get(template)
+            if plan is not None and plan["expires_at"] < time.time():
+                del self._plans[template]
+                plan = None
+            # entities the plan does not bind (e.g. "create 3 accounts") must be the same
+            if plan is None or any(entities.get(s) != v for s, v in plan["literals"].items()):
+                self.misses += 1
+                return None
+            self._plans.move_to_end(template)
+            self.hits += 1
+            return plan
+
+    def evict(self, template: str) -> None:
+        with self._lock:
+            if self._plans.pop(template, None) is not None:
+                self.evictions += 1
+
+    def record(self, query: str, messages: list) -> None:
+        """
+        Store the plan of a finished orchestrator turn, when every value it used is replayable.
+        """
+        if self.ttl <= 0:
+            return
+
+        steps = extract_steps(messages)
+        if not steps:
+            return
+
+        template, entities = templatize(query)
+        used = set()
+        for step in steps:
+            step["arguments"] = bind_value(step["arguments"], entities, used)
+            if step["arguments"] is None:
+                logger.info(f"Plan not cached, arguments derived from the request: {template}")
+                return
+
+        with self._lock:
+            self._plans[template] = {
+                "steps": steps,
+                "literals": {s: v for s, v in entities.items() if s not in used},
+                "expires_at": time.time() + self.ttl,
+            }
+            self._plans.move_to_end(template)
+            self.stores += 1
+            while len(self._plans) > self.max_size:
+                self._plans.popitem(last=False)
+                self.evictions += 1
+        logger.info(f"Plan cached: {template} -> {[(s['agent'], s['operation']) for s in steps]}")
+
+    def replay(self, query: str, agent):
+        """
+        Answer a request from a cached plan through the orchestrator tools, None on a miss.
+        """
+        if self.ttl <= 0:
+            return None
+
+        template, entities = templatize(query)
+        plan = self._lookup(template, entities)
+        if plan is None:
+            return None
+
+        tools = [agent.tool_registry.registry.get(step["agent"]) for step in plan["steps"]]
+        if any(tool is None for tool in tools):
+            self.evict(template)
+            return None
+
+        logger.info(f"Plan cache hit: {template}")
+        results = []
+        for tool, step in zip(tools, plan["steps"]):
+            result = tool(operation=step["operation"],
+                          arguments=resolve_value(step["arguments"], entities),
+                          fields=step["fields"])
+            results.append(result)
+            # writes may have run already, answer with the error instead of asking the LLM again
+            if result.get("status") != "success":
+                self.evict(template)
+                break
+
+        return render_results(results)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"size": len(self._plans), "hits": self.hits, "misses": self.misses,
+                    "stores": self.stores, "evictions": self.evictions}
+
+# global instance
+plan_cache = PlanCache()
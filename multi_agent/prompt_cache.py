@@ -0,0 +1,71 @@
+import os
+import logging
+
+from strands.models.model import CacheConfig
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# cache checkpoint after the static prefix (tool specs + system prompt) of every agent
+PROMPT_CACHE = os.getenv("PROMPT_CACHE", "true").lower() == "true"
+
+def cached_system_prompt(system_prompt: str):
+    """
+    System prompt with a cache checkpoint after it. Bedrock caches the prefix up to the checkpoint,
+    tool specs included since they come first, prefixes under the model minimum are not cached.
+    """
+    if not PROMPT_CACHE:
+        return system_prompt
+    return [{"text": system_prompt}, {"cachePoint": {"type": "default"}}]
+
+def prompt_cache_config(model_id: str) -> dict:
+    """
+    BedrockModel arguments of the tools checkpoint, only Anthropic models accept one on toolConfig.
+    """
+    if not PROMPT_CACHE or not any(name in model_id.lower() for name in ("claude", "anthropic")):
+        return {}
+    return {"cache_config": CacheConfig(strategy="anthropic", tools_ttl=True)}
+
+def cache_usage(agent) -> tuple:
+    usage = agent.event_loop_metrics.accumulated_usage
+    return usage.get("cacheReadInputTokens", 0), usage.get("cacheWriteInputTokens", 0)
+
+# Check the checkpoints sent to Bedrock against a stubbed Converse API, no AWS call is made
+if __name__ == "__main__":
+    import boto3
+    from botocore.stub import Stubber
+    from strands import Agent
+    from strands.models import BedrockModel
+    from strands_tools import calculator
+
+    from account_agent import ACCOUNT_SYSTEM_PROMPT
+
+    for model_id in ("us.amazon.nova-premier-v1:0", "us.anthropic.claude-sonnet-4-20250514-v1:0"):
+        model = BedrockModel(model_id=model_id, streaming=False,
+                             boto_session=boto3.Session(region_name="us-east-2",
+                                                        aws_access_key_id="stub", aws_secret_access_key="stub"),
+                             **prompt_cache_config(model_id))
+        stubber = Stubber(model.client)
+        for read, write in ((0, 1200), (1200, 0)):
+            stubber.add_response("converse", {
+                "output": {"message": {"role": "assistant", "content": [{"text": "ok"}]}},
+                "stopReason": "end_turn",
+                "usage": {"inputTokens": 20, "outputTokens": 2, "totalTokens": 1222,
+                          "cacheReadInputTokens": read, "cacheWriteInputTokens": write},
+                "metrics": {"latencyMs": 100},
+            })
+
+        requests = []
+        model.client.meta.events.register("provide-client-params.bedrock-runtime.Converse",
+                                          lambda params, **kwargs: requests.append(params))
+        agent = Agent(model=model, system_prompt=cached_system_prompt(ACCOUNT_SYSTEM_PROMPT), tools=[calculator],
+                      callback_handler=None)
+        with stubber:
+            agent("hello")
+            agent("hello again")
+
+        print(f"{model_id}")
+        print(f"  system blocks: {[list(block) for block in requests[0]['system']]}")
+        print(f"  tool blocks: {[list(block) for block in requests[0]['toolConfig']['tools']]}")
+        print(f"  cache read/write tokens: {cache_usage(agent)}")
@@ -0,0 +1,138 @@
+import os
+import json
+import base64
+import hashlib
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from contextlib import contextmanager
+
+import jwt
+
+# signature check of incoming JWTs, by the JWKS of the issuer or a fixed key (PEM public key or HS secret)
+JWT_JWKS_URL = os.getenv("JWT_JWKS_URL")
+JWT_VERIFY_KEY = os.getenv("JWT_VERIFY_KEY")
+JWT_ALGORITHMS = os.getenv("JWT_ALGORITHMS", "RS256").split(",")
+JWT_AUDIENCE = os.getenv("JWT_AUDIENCE") or None
+JWT_ISSUER = os.getenv("JWT_ISSUER") or None
+
+# global instance, caches the signing keys
+_jwks_client = jwt.PyJWKClient(JWT_JWKS_URL) if JWT_JWKS_URL else None
+
+def jwt_claims(token: str) -> dict:
+    """
+    Claims of a JWT, read without verification (the services behind MCP verify it).
+    """
+    try:
+        payload = token.split(".")[1]
+        return json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except Exception:
+        return {}
+
+def token_subject(token: str) -> str:
+    """
+    Tenant/subject of a JWT, falls back to a hash of the token.
+    """
+    if not token:
+        return "anonymous"
+
+    claims = jwt_claims(token)
+    if "sub" in claims:
+        return f"{claims.get('tenant_id', '')}/{claims['sub']}"
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+def verified_claims(token: str):
+    """
+    Claims of a JWT whose signature, expiry, audience and issuer check out, None when no key is
+    configured (JWT_JWKS_URL or JWT_VERIFY_KEY). Raises jwt.InvalidTokenError for a bad token.
+    """
+    if _jwks_client is None and not JWT_VERIFY_KEY:
+        return None
+
+    key = _jwks_client.get_signing_key_from_jwt(token).key if _jwks_client else JWT_VERIFY_KEY
+    return jwt.decode(token, key, algorithms=JWT_ALGORITHMS, audience=JWT_AUDIENCE, issuer=JWT_ISSUER,
+                      options={"require": ["sub", "exp"], "verify_aud": JWT_AUDIENCE is not None})
+
+def token_owner(token: str) -> str:
+    """
+    Identity the data of a caller is bound to across requests: the verified tenant/subject, so it
+    survives token refreshes, or the token fingerprint when tokens can not be verified here.
+    """
+    claims = verified_claims(token) if token else None
+    if claims is None:
+        return token_fingerprint(token)
+    return f"{claims.get('tenant_id', '')}/{claims['sub']}"
+
+def token_fingerprint(token: str) -> str:
+    """
+    Hash of the whole token. Unlike token_subject it can not be forged from unverified claims,
+    use it wherever data is shared between requests of the same caller.
+    """
+    if not token:
+        return "anonymous"
+    return hashlib.sha256(token.encode()).hexdigest()
+
+class RequestContext:
+    """
+    Credentials and identity of the request being processed.
+    """
+
+    def __init__(self, token: str, session_id: str = None, tenant: str = None, sink=None):
+        self.token = token
+        self.session_id = session_id
+        self.tenant = tenant or jwt_claims(token or "").get("tenant_id")
+        self.subject = token_subject(token)
+        # thread safe callable receiving stream events, None when the caller does not stream
+        self.sink = sink
+        # llm calls, mcp calls and tokens spent on the request, sub-agents included
+        self.usage = Counter()
+        self._usage_lock = threading.Lock()
+
+_request_context = ContextVar("request_context", default=None)
+
+def set_request_context(context: RequestContext):
+    return _request_context.set(context)
+
+def reset_request_context(reset_token) -> None:
+    _request_context.reset(reset_token)
+
+def get_request_context():
+    return _request_context.get()
+
+def get_token():
+    context = _request_context.get()
+    return context.token if context else None
+
+def emit(event: dict) -> None:
+    """
+    Forward a stream event to the caller of the current request, if it streams.
+    """
+    context = _request_context.get()
+    if context is not None and context.sink is not None:
+        context.sink(event)
+
+def record_usage(**counts) -> None:
+    """
+    Add to the usage counters of the current request, if any.
+    """
+    context = _request_context.get()
+    if context is not None:
+        with context._usage_lock:
+            context.usage.update(counts)
+
+@contextmanager
+def request_scope(token: str, session_id: str = None, tenant: str = None, sink=None):
+    """
+    Bind a RequestContext to the current task/thread, copied into threads and tasks it starts.
+    """
+    reset_token = set_request_context(RequestContext(token, session_id, tenant, sink))
+    try:
+        yield get_request_context()
+    finally:
+        reset_request_context(reset_token)
+
+def credential_meta(token: str) -> dict:
+    """
+    MCP request _meta carrying the credential, the per-request equivalent of an Authorization header.
+    """
+    return {"authorization": f"Bearer {token}"} if token else None
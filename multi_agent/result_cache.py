@@ -0,0 +1,153 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from request_context import token_fingerprint
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "1024"))
+
+# Idempotent MCP reads and their time to live (seconds), override with RESULT_CACHE_TTL_<TOOL>
+RESULT_CACHE_TTLS = {
+    "get_account": 300,
+    "get_account_from_person": 300,
+    "get_card": 300,
+    "get_account_statement": 30,
+    "get_card_payment": 30,
+}
+
+# MCP writes and the reads they make stale: read tool -> {read argument: write argument}
+RESULT_CACHE_INVALIDATIONS = {
+    "create_account": [("get_account", {"account": "account"}),
+                       ("get_account_from_person", {"person": "person"})],
+    "create_card": [("get_card", {"card": "card"})],
+    "create_moviment_transaction": [("get_account_statement", {"account": "account"})],
+    "create_payment": [("get_card_payment", {"card": "card"})],
+}
+
+def normalize_arguments(arguments: dict) -> dict:
+    return {k: v.strip() if isinstance(v, str) else v
+                for k, v in sorted((arguments or {}).items()) if k != "jwt"}
+
+def read_tags(tool_name: str, arguments: dict) -> list:
+    return [(tool_name, k, v) for k, v in arguments.items() if isinstance(v, (str, int, float))]
+
+class ResultCache:
+    """
+    Read-through LRU cache of MCP tool results keyed by tool, normalized arguments and a hash of the
+    JWT, so a hit goes only to a token the backend already accepted. Writes invalidate the related reads for every token.
+    Every invalidation moves the generation of its tags, a read is only stored when the generation of
+    its tags did not move since its lookup (a write in between may have made it stale).
+    """
+
+    def __init__(self, max_size: int = RESULT_CACHE_SIZE, ttls: dict = None, invalidations: dict = None):
+        self.max_size = max_size
+        self.ttls = ttls if ttls is not None else {
+            tool: float(os.getenv(f"RESULT_CACHE_TTL_{tool.upper()}", ttl)) for tool, ttl in RESULT_CACHE_TTLS.items()
+        }
+        self.invalidations = invalidations if invalidations is not None else RESULT_CACHE_INVALIDATIONS
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._tags = {}
+        # tag -> clock of its last invalidation, tags without one are at the floor
+        self._generations = {}
+        self._clock = 0
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def _remove(self, key) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _generation(self, tags: list) -> int:
+        return max([self._generations.get(tag, self._floor) for tag in tags], default=self._floor)
+
+    def lookup(self, tool_name: str, arguments: dict, token: str) -> tuple:
+        """
+        (cached result, generation) of a read, the result is None on a miss or for tools that are not cached.
+        Pass the generation to record() with the result of the call.
+        """
+        if self.ttls.get(tool_name, 0) <= 0:
+            return None, None
+
+        arguments = normalize_arguments(arguments)
+        key = (token_fingerprint(token), tool_name, json.dumps(arguments, sort_keys=True))
+        with self._lock:
+            generation = self._generation(read_tags(tool_name, arguments))
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None, generation
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        logger.info(f"Result cache hit: {tool_name} {arguments}")
+        return entry[1], generation
+
+    def record(self, tool_name: str, arguments: dict, token: str, result: dict, generation: int = None) -> None:
+        """
+        Store a successful read looked up at generation, or invalidate the reads a write made stale.
+        """
+        if tool_name in self.invalidations:
+            self.invalidate(tool_name, arguments)
+            return
+
+        ttl = self.ttls.get(tool_name, 0)
+        if ttl <= 0 or result.get("status") != "success":
+            return
+
+        arguments = normalize_arguments(arguments)
+        key = (token_fingerprint(token), tool_name, json.dumps(arguments, sort_keys=True))
+        tags = read_tags(tool_name, arguments)
+        with self._lock:
+            # not looked up, or invalidated since
+            if generation is None:
+                return
+            if self._generation(tags) != generation:
+                logger.info(f"Result cache skipped {tool_name} {arguments}: invalidated while it was read")
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + ttl, result, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tool_name: str, arguments: dict) -> None:
+        arguments = normalize_arguments(arguments)
+        with self._lock:
+            self._clock += 1
+            # forgetting generations raises the floor, reads looked up before it are not stored
+            if len(self._generations) > 4 * self.max_size:
+                self._generations.clear()
+                self._floor = self._clock
+
+            for read_tool, mapping in self.invalidations.get(tool_name, []):
+                for read_arg, write_arg in mapping.items():
+                    if write_arg not in arguments:
+                        continue
+                    tag = (read_tool, read_arg, arguments[write_arg])
+                    self._generations[tag] = self._clock
+                    for key in list(self._tags.get(tag, ())):
+                        self._remove(key)
+                        logger.info(f"Result cache invalidated by {tool_name}: {key[1]} {key[2]}")
+
+# global instance
+result_cache = ResultCache()
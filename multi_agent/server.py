@@ -0,0 +1,303 @@
+import os
+import re
+import json
+import time
+import math
+import uuid
+import asyncio
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+from mcp_pool import get_mcp_pool
+from tool_catalog import get_tool_catalog
+import jwt
+from request_context import JWT_JWKS_URL, JWT_VERIFY_KEY, token_owner, request_scope
+from model_registry import model_stats
+from plan_cache import plan_cache
+from circuit_breaker import circuit_breakers, CircuitOpenError
+from main_agent import create_main_agent, clear_session, process_request_async, process_request_stream
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8080"))
+SERVER_MAX_INFLIGHT = int(os.getenv("SERVER_MAX_INFLIGHT", "32"))
+SERVER_QUEUE_TIMEOUT = float(os.getenv("SERVER_QUEUE_TIMEOUT", "5"))
+# default executor of the loop (route, plan replay, sync sub-agent tools), a few threads per admitted request
+SERVER_EXECUTOR_THREADS = int(os.getenv("SERVER_EXECUTOR_THREADS", str(SERVER_MAX_INFLIGHT * 4)))
+SERVER_MAX_CONVERSATIONS = int(os.getenv("SERVER_MAX_CONVERSATIONS", "1000"))
+SERVER_CONVERSATION_TTL = float(os.getenv("SERVER_CONVERSATION_TTL", "1800"))
+
+MODEL_NAME = "py-payment-agent"
+
+# conversation ids are chosen by the client and end up in the session id
+CONVERSATION_ID_PATTERN = re.compile(r"[A-Za-z0-9_.-]{1,128}")
+
+def conversation_session_id(owner: str, conversation_id: str) -> str:
+    """
+    Session id of a conversation, scoped by its owner: the same conversation_id sent by another
+    user (or after a restart, by another pod sharing the store) never restores this history.
+    """
+    return f"{hashlib.sha256(owner.encode()).hexdigest()[:32]}_{conversation_id}"
+
+class Conversation:
+    """
+    One user conversation: its own orchestrator, session and lock.
+    It belongs to the verified tenant/subject of the token (see token_owner), each turn runs
+    with the token of its own request, so a refreshed token keeps the conversation.
+    """
+
+    def __init__(self, conversation_id: str, owner: str, session_id: str, agent, session_manager):
+        self.conversation_id = conversation_id
+        self.owner = owner
+        self.session_id = session_id
+        self.agent = agent
+        self.session_manager = session_manager
+        self.lock = asyncio.Lock()
+        self.last_used = time.time()
+
+class ConversationRegistry:
+    """
+    Live conversations by session id, idle ones are evicted after SERVER_CONVERSATION_TTL seconds.
+    Orchestrators are built and sessions read or deleted in worker threads, not on the event loop.
+    """
+
+    def __init__(self, max_conversations: int = SERVER_MAX_CONVERSATIONS, ttl: float = SERVER_CONVERSATION_TTL):
+        self.max_conversations = max_conversations
+        self.ttl = ttl
+        self._conversations = {}
+        self._lock = asyncio.Lock()
+
+    async def _evict(self) -> None:
+        now = time.time()
+        idle = [c for c in self._conversations.values() if not c.lock.locked() and now - c.last_used > self.ttl]
+        for conversation in idle:
+            await self.remove(conversation.session_id)
+
+    def get(self, conversation_id: str, owner: str):
+        return self._conversations.get(conversation_session_id(owner, conversation_id))
+
+    async def get_or_create(self, conversation_id: str, owner: str) -> Conversation:
+        session_id = conversation_session_id(owner, conversation_id)
+        async with self._lock:
+            conversation = self._conversations.get(session_id)
+            if conversation is None:
+                await self._evict()
+                if len(self._conversations) >= self.max_conversations:
+                    raise web.HTTPServiceUnavailable(text="too many open conversations")
+
+                agent, session_manager = await asyncio.to_thread(create_main_agent, session_id)
+                conversation = Conversation(conversation_id, owner, session_id, agent, session_manager)
+                self._conversations[session_id] = conversation
+
+            conversation.last_used = time.time()
+            return conversation
+
+    async def remove(self, session_id: str) -> None:
+        conversation = self._conversations.pop(session_id, None)
+        if conversation is not None:
+            await asyncio.to_thread(clear_session, conversation.session_manager)
+
+def bearer_token(request: web.Request) -> str:
+    auth = request.headers.get("Authorization", "")
+    if not auth.lower().startswith("bearer ") or not auth[7:].strip():
+        raise web.HTTPUnauthorized(text="No JWT provided, NOT AUTHORIZED !!!")
+    return auth[7:].strip()
+
+async def request_owner(token: str) -> str:
+    try:
+        # may fetch the issuer JWKS
+        return await asyncio.to_thread(token_owner, token)
+    except jwt.InvalidTokenError as e:
+        raise web.HTTPUnauthorized(text=f"Invalid JWT, NOT AUTHORIZED !!! {e}")
+
+def last_user_message(body: dict) -> str:
+    messages = body.get("messages") or []
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            content = message.get("content")
+            if isinstance(content, list):
+                content = "".join(c.get("text", "") for c in content if isinstance(c, dict))
+            if content and content.strip():
+                return content.strip()
+
+    raise web.HTTPBadRequest(text="Please enter a valid message.")
+
+def completion(conversation_id: str, content: str) -> dict:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": MODEL_NAME,
+        "conversation_id": conversation_id,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+    }
+
+def completion_chunk(conversation_id: str, completion_id: str, delta: dict, finish_reason: str = None, progress: dict = None) -> dict:
+    chunk = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": MODEL_NAME,
+        "conversation_id": conversation_id,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    # tool calls and sub-agent partial output, outside the assistant message
+    if progress is not None:
+        chunk["progress"] = progress
+    return chunk
+
+async def write_sse(response: web.StreamResponse, data) -> None:
+    payload = data if isinstance(data, str) else json.dumps(data, ensure_ascii=False)
+    await response.write(f"data: {payload}\n\n".encode())
+
+class ChatServer:
+    """
+    asyncio HTTP front end, many independent conversations served concurrently.
+    In flight requests are bounded, callers waiting longer than SERVER_QUEUE_TIMEOUT get a 429.
+    """
+
+    def __init__(self, max_inflight: int = SERVER_MAX_INFLIGHT, queue_timeout: float = SERVER_QUEUE_TIMEOUT):
+        self.conversations = ConversationRegistry()
+        self.queue_timeout = queue_timeout
+        self.max_inflight = max_inflight
+        self.inflight = 0
+        self._slots = asyncio.Semaphore(max_inflight)
+
+    async def _acquire(self) -> None:
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise web.HTTPTooManyRequests(text="server busy, retry later",
+                                          headers={"Retry-After": str(int(self.queue_timeout))})
+        self.inflight += 1
+
+    def _release(self) -> None:
+        self.inflight -= 1
+        self._slots.release()
+
+    async def _answer(self, conversation: Conversation, user_input: str, token: str) -> str:
+        async with conversation.lock:
+            with request_scope(token, conversation.conversation_id):
+                return await process_request_async(conversation.agent, user_input, token)
+
+    async def _stream_answer(self, response: web.StreamResponse, conversation: Conversation, user_input: str, token: str) -> None:
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        conversation_id = conversation.conversation_id
+        await write_sse(response, completion_chunk(conversation_id, completion_id, {"role": "assistant", "content": ""}))
+
+        async with conversation.lock:
+            with request_scope(token, conversation_id):
+                async for event in process_request_stream(conversation.agent, user_input, token):
+                    if event["type"] == "text" and event["agent"] is None:
+                        await write_sse(response, completion_chunk(conversation_id, completion_id, {"content": event["data"]}))
+                    else:
+                        await write_sse(response, completion_chunk(conversation_id, completion_id, {}, progress=event))
+
+        await write_sse(response, completion_chunk(conversation_id, completion_id, {}, "stop"))
+        await write_sse(response, "[DONE]")
+
+    async def chat_completions(self, request: web.Request) -> web.StreamResponse:
+        token = bearer_token(request)
+        owner = await request_owner(token)
+        try:
+            body = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text="invalid JSON body")
+
+        user_input = last_user_message(body)
+        conversation_id = body.get("conversation_id") or request.headers.get("X-Conversation-Id") or uuid.uuid4().hex
+        if not CONVERSATION_ID_PATTERN.fullmatch(conversation_id):
+            raise web.HTTPBadRequest(text="conversation_id must be 1 to 128 letters, digits, '_', '.' or '-'")
+
+        await self._acquire()
+        try:
+            conversation = await self.conversations.get_or_create(conversation_id, owner)
+
+            if not body.get("stream"):
+                content = await self._answer(conversation, user_input, token)
+                return web.json_response(completion(conversation_id, content))
+
+            response = web.StreamResponse(headers={"Content-Type": "text/event-stream",
+                                                   "Cache-Control": "no-cache",
+                                                   "X-Conversation-Id": conversation_id})
+            await response.prepare(request)
+
+            try:
+                await self._stream_answer(response, conversation, user_input, token)
+            except Exception as e:
+                # headers are gone, report the failure in the stream
+                logger.error(f"Error processing your query: {str(e)}")
+                await write_sse(response, {"error": {"message": f"Error processing your query: {str(e)}"}})
+            await response.write_eof()
+            return response
+        except web.HTTPException:
+            raise
+        except CircuitOpenError as e:
+            logger.warning(f"Request failed fast: {e}")
+            raise web.HTTPServiceUnavailable(text=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+        except Exception as e:
+            logger.error(f"Error processing your query: {str(e)}")
+            raise web.HTTPInternalServerError(text=f"Error processing your query: {str(e)}")
+        finally:
+            self._release()
+
+    async def delete_conversation(self, request: web.Request) -> web.Response:
+        owner = await request_owner(bearer_token(request))
+        conversation_id = request.match_info["conversation_id"]
+
+        # conversations of other users are not visible
+        conversation = self.conversations.get(conversation_id, owner)
+        if conversation is None:
+            raise web.HTTPNotFound(text="conversation not found")
+
+        async with conversation.lock:
+            await self.conversations.remove(conversation.session_id)
+        return web.json_response({"status": "deleted", "conversation_id": conversation_id})
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok",
+                                  "inflight": self.inflight,
+                                  "max_inflight": self.max_inflight,
+                                  "models": model_stats.snapshot(),
+                                  "plan_cache": plan_cache.snapshot(),
+                                  "circuit_breakers": circuit_breakers.snapshot()})
+
+async def on_startup(app: web.Application) -> None:
+    if not JWT_JWKS_URL and not JWT_VERIFY_KEY:
+        logger.warning("JWT_JWKS_URL / JWT_VERIFY_KEY not set, conversations are bound to the exact token and end when it is refreshed")
+
+    # the stock executor has min(32, cpu + 4) threads, admitted requests would queue behind it instead of getting a 429
+    asyncio.get_running_loop().set_default_executor(app["executor"])
+
+    # warm the shared mcp sessions and tool catalog before the first request
+    await asyncio.to_thread(get_mcp_pool().start)
+    await asyncio.to_thread(get_tool_catalog().prefetch)
+
+async def on_cleanup(app: web.Application) -> None:
+    app["executor"].shutdown(wait=False, cancel_futures=True)
+
+def create_app() -> web.Application:
+    server = ChatServer()
+
+    app = web.Application()
+    app["executor"] = ThreadPoolExecutor(max_workers=SERVER_EXECUTOR_THREADS, thread_name_prefix="request")
+    app.router.add_post("/v1/chat/completions", server.chat_completions)
+    app.router.add_delete("/v1/conversations/{conversation_id}", server.delete_conversation)
+    app.router.add_get("/health", server.health)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+if __name__ == "__main__":
+    print('\033[1;33m Multi Agent server v 0.5 \033[0m \n')
+    web.run_app(create_app(), host=SERVER_HOST, port=SERVER_PORT)
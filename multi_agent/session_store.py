@@ -0,0 +1,430 @@
+import os
+import json
+import time
+import atexit
+import sqlite3
+import logging
+import threading
+import weakref
+
+from strands.session.session_repository import SessionRepository
+from strands.session.repository_session_manager import RepositorySessionManager
+from strands.session.file_session_manager import FileSessionManager
+from strands.types.exceptions import SessionException
+from strands.types.session import Session, SessionAgent, SessionMessage, SessionType
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SESSION_STORE = os.getenv("SESSION_STORE", "log")   # log | sqlite | memory | file
+SESSION_STORE_DIR = os.getenv("SESSION_STORE_DIR", "./sessions")
+SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", "1"))
+SESSION_COMPACT_RECORDS = int(os.getenv("SESSION_COMPACT_RECORDS", "200"))
+
+def validate_session_id(session_id: str) -> str:
+    """
+    Same check as the strands file and s3 session managers: the id names a file, it can not hold a path.
+    """
+    if not session_id or os.path.basename(session_id) != session_id or session_id in (".", ".."):
+        raise ValueError(f"session_id={session_id} | id cannot contain path separators")
+    return session_id
+
+class SessionState:
+    """
+    Live state of one session, rebuilt by replaying its records (the last write of a key wins).
+    """
+
+    def __init__(self):
+        self.session = None
+        self.agents = {}
+        self.messages = {}
+
+    def apply(self, record: dict) -> None:
+        if record["type"] == "session":
+            self.session = record["data"]
+        elif record["type"] == "agent":
+            self.agents[record["data"]["agent_id"]] = record["data"]
+            self.messages.setdefault(record["data"]["agent_id"], {})
+        elif record["type"] == "message":
+            self.messages.setdefault(record["agent_id"], {})[record["data"]["message_id"]] = record["data"]
+
+    def records(self) -> list:
+        """
+        Smallest list of records rebuilding this state, written on compaction.
+        """
+        records = [{"type": "session", "data": self.session}] if self.session else []
+        records += [{"type": "agent", "data": agent} for agent in self.agents.values()]
+        for agent_id, messages in self.messages.items():
+            records += [{"type": "message", "agent_id": agent_id, "data": messages[message_id]}
+                            for message_id in sorted(messages)]
+        return records
+
+    def size(self) -> int:
+        return (1 if self.session else 0) + len(self.agents) + sum(len(m) for m in self.messages.values())
+
+class LogBackend:
+    """
+    One append-only JSON lines log per session.
+    """
+
+    def __init__(self, storage_dir: str = SESSION_STORE_DIR):
+        self.storage_dir = storage_dir
+
+    def _path(self, session_id: str) -> str:
+        validate_session_id(session_id)
+        return os.path.join(self.storage_dir, f"session_{session_id}.log")
+
+    def load(self, session_id: str):
+        path = self._path(session_id)
+        if not os.path.exists(path):
+            return None
+
+        records = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # a torn last line of a crashed flush
+                    logger.warning(f"Skipping corrupt record of session {session_id}")
+        return records
+
+    def append(self, session_id: str, records: list) -> None:
+        os.makedirs(self.storage_dir, exist_ok=True)
+        with open(self._path(session_id), "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+
+    def rewrite(self, session_id: str, records: list) -> None:
+        os.makedirs(self.storage_dir, exist_ok=True)
+        path = self._path(session_id)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+        os.replace(f"{path}.tmp", path)
+
+    def delete(self, session_id: str) -> None:
+        path = self._path(session_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+class SQLiteBackend:
+    """
+    Session records in a local SQLite database, one row per record.
+    """
+
+    def __init__(self, path: str = os.path.join(SESSION_STORE_DIR, "sessions.db")):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS session_records ("
+                         "seq INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, record TEXT NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS session_records_id ON session_records (session_id, seq)")
+        self._db.commit()
+
+    def load(self, session_id: str):
+        with self._lock:
+            rows = self._db.execute("SELECT record FROM session_records WHERE session_id = ? ORDER BY seq",
+                                    (session_id,)).fetchall()
+        return [json.loads(row[0]) for row in rows] if rows else None
+
+    def append(self, session_id: str, records: list) -> None:
+        with self._lock, self._db:
+            self._db.executemany("INSERT INTO session_records (session_id, record) VALUES (?, ?)",
+                                 [(session_id, json.dumps(r, ensure_ascii=False)) for r in records])
+
+    def rewrite(self, session_id: str, records: list) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM session_records WHERE session_id = ?", (session_id,))
+            self._db.executemany("INSERT INTO session_records (session_id, record) VALUES (?, ?)",
+                                 [(session_id, json.dumps(r, ensure_ascii=False)) for r in records])
+
+    def delete(self, session_id: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM session_records WHERE session_id = ?", (session_id,))
+
+class SessionStore(SessionRepository):
+    """
+    Session repository serving reads from memory and persisting writes behind the request path:
+    records are buffered and a background thread flushes them every flush_interval seconds,
+    one append per session. A log holding more than compact_records records, over half of them
+    stale, is rewritten from the live state. Without a backend sessions only live in memory.
+    """
+
+    def __init__(self, backend=None, flush_interval: float = SESSION_FLUSH_INTERVAL,
+                 compact_records: int = SESSION_COMPACT_RECORDS):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.compact_records = compact_records
+        self._sessions = {}
+        self._pending = {}
+        self._log_sizes = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher = None
+
+    def _state(self, session_id: str):
+        validate_session_id(session_id)
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is not None or self.backend is None:
+                return state
+
+        records = self.backend.load(session_id)
+        if records is None:
+            return None
+
+        state = SessionState()
+        for record in records:
+            state.apply(record)
+
+        with self._lock:
+            self._log_sizes[session_id] = len(records)
+            return self._sessions.setdefault(session_id, state)
+
+    def _write(self, session_id: str, record: dict) -> None:
+        validate_session_id(session_id)
+        with self._lock:
+            self._sessions.setdefault(session_id, SessionState()).apply(record)
+            if self.backend is None:
+                return
+            self._pending.setdefault(session_id, []).append(record)
+
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="session-store", daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Session flush failed. Reason: {e}")
+
+    def flush(self) -> None:
+        """
+        Persist the buffered records, one append (or one compaction) per session.
+        The records of a session whose write fails go back to the buffer for the next flush,
+        the first failure is raised once every session was tried.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                writes = []
+                for session_id, records in pending.items():
+                    state = self._sessions.get(session_id)
+                    log_size = self._log_sizes.get(session_id, 0)
+                    grown = log_size + len(records)
+                    if state is not None and grown > self.compact_records and grown > 2 * state.size():
+                        writes.append((self.backend.rewrite, session_id, state.records(), log_size))
+                    else:
+                        writes.append((self.backend.append, session_id, records, log_size))
+
+            error = None
+            for write, session_id, records, log_size in writes:
+                try:
+                    write(session_id, records)
+                except Exception as e:
+                    logger.error(f"Failed to persist session {session_id}, keeping its {len(pending[session_id])} records for the next flush. Reason: {e}")
+                    error = error or e
+                    with self._lock:
+                        # a session deleted meanwhile is not written back
+                        if session_id in self._sessions:
+                            self._pending[session_id] = pending[session_id] + self._pending.get(session_id, [])
+                    continue
+
+                with self._lock:
+                    self._log_sizes[session_id] = len(records) if write == self.backend.rewrite else log_size + len(records)
+                if write == self.backend.rewrite:
+                    logger.info(f"Session {session_id} compacted to {len(records)} records")
+
+            if error is not None:
+                raise error
+
+    def close(self) -> None:
+        self._closed.set()
+        if self.backend is not None:
+            self.flush()
+
+    def delete_session(self, session_id: str, **kwargs) -> None:
+        validate_session_id(session_id)
+        with self._flush_lock:
+            with self._lock:
+                self._sessions.pop(session_id, None)
+                self._pending.pop(session_id, None)
+                self._log_sizes.pop(session_id, None)
+            if self.backend is not None:
+                self.backend.delete(session_id)
+
+    def create_session(self, session: Session, **kwargs) -> Session:
+        if self._state(session.session_id) is not None:
+            raise SessionException(f"Session {session.session_id} already exists")
+        self._write(session.session_id, {"type": "session", "data": session.to_dict()})
+        return session
+
+    def read_session(self, session_id: str, **kwargs):
+        state = self._state(session_id)
+        if state is None or state.session is None:
+            return None
+        return Session.from_dict(state.session)
+
+    def create_agent(self, session_id: str, session_agent: SessionAgent, **kwargs) -> None:
+        self._write(session_id, {"type": "agent", "data": session_agent.to_dict()})
+
+    def read_agent(self, session_id: str, agent_id: str, **kwargs):
+        state = self._state(session_id)
+        if state is None or agent_id not in state.agents:
+            return None
+        return SessionAgent.from_dict(state.agents[agent_id])
+
+    def update_agent(self, session_id: str, session_agent: SessionAgent, **kwargs) -> None:
+        previous = self.read_agent(session_id, session_agent.agent_id)
+        if previous is None:
+            raise SessionException(f"Agent {session_agent.agent_id} in session {session_id} does not exist")
+
+        session_agent.created_at = previous.created_at
+        self._write(session_id, {"type": "agent", "data": session_agent.to_dict()})
+
+    def create_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs) -> None:
+        self._write(session_id, {"type": "message", "agent_id": agent_id, "data": session_message.to_dict()})
+
+    def read_message(self, session_id: str, agent_id: str, message_id: int, **kwargs):
+        state = self._state(session_id)
+        message = state.messages.get(agent_id, {}).get(message_id) if state else None
+        return SessionMessage.from_dict(message) if message else None
+
+    def update_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs) -> None:
+        previous = self.read_message(session_id, agent_id, session_message.message_id)
+        if previous is None:
+            raise SessionException(f"Message {session_message.message_id} in session {session_id} does not exist")
+
+        session_message.created_at = previous.created_at
+        self._write(session_id, {"type": "message", "agent_id": agent_id, "data": session_message.to_dict()})
+
+    def list_messages(self, session_id: str, agent_id: str, limit: int = None, offset: int = 0, **kwargs) -> list:
+        state = self._state(session_id)
+        if state is None:
+            return []
+
+        messages = state.messages.get(agent_id, {})
+        message_ids = sorted(messages)[offset:]
+        if limit is not None:
+            message_ids = message_ids[:limit]
+        return [SessionMessage.from_dict(messages[message_id]) for message_id in message_ids]
+
+def create_session_store(kind: str = SESSION_STORE, storage_dir: str = SESSION_STORE_DIR) -> SessionStore:
+    if kind == "memory":
+        return SessionStore()
+    if kind == "sqlite":
+        return SessionStore(SQLiteBackend(os.path.join(storage_dir, "sessions.db")))
+    if kind == "log":
+        return SessionStore(LogBackend(storage_dir))
+    raise ValueError(f"Unknown SESSION_STORE: {kind}")
+
+_session_store = None
+_session_store_lock = threading.Lock()
+
+def get_session_store() -> SessionStore:
+    global _session_store
+    with _session_store_lock:
+        if _session_store is None:
+            _session_store = create_session_store()
+            logger.info(f"Session store: {SESSION_STORE} at {SESSION_STORE_DIR}")
+        return _session_store
+
+# session manager of each agent, for the attempts holding back its messages
+_session_managers = weakref.WeakKeyDictionary()
+
+def held_session(agent):
+    """
+    Session manager of an agent able to hold back messages, None for agents without a session.
+    """
+    return _session_managers.get(agent)
+
+class HeldMessages:
+    """
+    Messages of an attempt that may still be undone (see TieredInvocation) are held back:
+    hold() buffers the messages appended from then on, accept() persists them, discard() drops them.
+    """
+
+    _held = None
+
+    def initialize(self, agent, **kwargs) -> None:
+        super().initialize(agent, **kwargs)
+        _session_managers[agent] = self
+
+    def hold(self) -> None:
+        self._held = []
+
+    def accept(self) -> None:
+        held, self._held = self._held or [], None
+        for message, agent in held:
+            super().append_message(message, agent)
+
+    def discard(self) -> None:
+        self._held = None
+
+    def append_message(self, message, agent, **kwargs) -> None:
+        if self._held is None:
+            return super().append_message(message, agent, **kwargs)
+        self._held.append((message, agent))
+
+    def redact_latest_message(self, redact_message, agent, **kwargs) -> None:
+        if not self._held:
+            return super().redact_latest_message(redact_message, agent, **kwargs)
+        self._held[-1] = (redact_message, agent)
+
+class HeldRepositorySessionManager(HeldMessages, RepositorySessionManager):
+    pass
+
+class HeldFileSessionManager(HeldMessages, FileSessionManager):
+    pass
+
+def create_session_manager(session_id: str):
+    """
+    Session manager of the configured SESSION_STORE, "file" keeps the per message FileSessionManager.
+    """
+    if SESSION_STORE == "file":
+        return HeldFileSessionManager(session_id=session_id, storage_dir=SESSION_STORE_DIR)
+    return HeldRepositorySessionManager(session_id=session_id, session_repository=get_session_store())
+
+@atexit.register
+def close_session_store() -> None:
+    if _session_store is not None:
+        _session_store.close()
+
+# Benchmark of the backends against per message file writes
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    messages = 500
+    root = tempfile.mkdtemp()
+    stores = {
+        "file": FileSessionManager(session_id="bench", storage_dir=os.path.join(root, "file")),
+        "log": create_session_store("log", os.path.join(root, "log")),
+        "sqlite": create_session_store("sqlite", os.path.join(root, "sqlite")),
+        "memory": create_session_store("memory"),
+    }
+
+    for kind, store in stores.items():
+        # the file session manager creates its session on init
+        if kind != "file":
+            store.create_session(Session(session_id="bench", session_type=SessionType.AGENT))
+        store.create_agent("bench", SessionAgent(agent_id="main", state={}, conversation_manager_state={}))
+
+        started = time.perf_counter()
+        for i in range(messages):
+            message = {"role": "user" if i % 2 == 0 else "assistant", "content": [{"text": f"message {i} " * 20}]}
+            store.create_message("bench", "main", SessionMessage.from_message(message, i))
+        request_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        if kind != "file":
+            store.close()
+        flush_ms = (time.perf_counter() - started) * 1000
+
+        print(f"{kind:>7} | {messages} appends on the request path {request_ms:>8.1f}ms | final flush {flush_ms:>7.1f}ms")
+
+    shutil.rmtree(root)
@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+import logging
+import subprocess
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# modules shown, by cumulative import time
+STARTUP_PROFILE_TOP = int(os.getenv("STARTUP_PROFILE_TOP", "20"))
+STARTUP_PROFILE_MODULE = os.getenv("STARTUP_PROFILE_MODULE", "main_agent")
+
+def import_times(module: str) -> list:
+    """
+    (self_us, cumulative_us, name) of every module imported by `import module`, from
+    python -X importtime in a fresh interpreter.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed: {result.stderr.strip().splitlines()[-1:]}")
+
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times.append((int(self_us), int(cumulative_us), name.strip()))
+    return times
+
+# Where the startup of an agent module goes: import breakdown, then import and first agent in process
+if __name__ == "__main__":
+    times = import_times(STARTUP_PROFILE_MODULE)
+    total = next((c for _, c, name in times if name == STARTUP_PROFILE_MODULE), 0)
+
+    print(f"\n{'cumulative ms':>14} {'self ms':>9}  module")
+    for self_us, cumulative_us, name in sorted(times, key=lambda t: t[1], reverse=True)[:STARTUP_PROFILE_TOP]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+    print(f"\n{len(times)} modules, import {STARTUP_PROFILE_MODULE}: {total / 1000:.1f} ms")
+
+    if STARTUP_PROFILE_MODULE == "main_agent":
+        started = time.perf_counter()
+        import main_agent
+        imported = time.perf_counter()
+        main_agent.get_main_agent()
+        created = time.perf_counter()
+        print(f"in process: import {(imported - started) * 1000:.1f} ms, first agent {(created - imported) * 1000:.1f} ms")
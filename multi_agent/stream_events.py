@@ -0,0 +1,58 @@
+import logging
+
+from request_context import emit
+from thinking_filter import ThinkingFilter
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class StreamTranslator:
+    """
+    Turns strands stream events into the events sent to a streaming caller:
+        - {"type": "text", "agent": name, "data": text} thinking free text
+        - {"type": "tool", "agent": name, "name": tool} once per tool call
+    The orchestrator uses agent None, sub-agents their own name.
+    """
+
+    def __init__(self, agent_name: str = None):
+        self.agent_name = agent_name
+        self.thinking = ThinkingFilter()
+        self.tool_use_id = None
+
+    def translate(self, event: dict) -> list:
+        if "data" in event:
+            text = self.thinking.feed(event["data"])
+            return [{"type": "text", "agent": self.agent_name, "data": text}] if text else []
+
+        tool_use = event.get("current_tool_use")
+        if tool_use and tool_use.get("toolUseId") != self.tool_use_id:
+            self.tool_use_id = tool_use.get("toolUseId")
+            return [{"type": "tool", "agent": self.agent_name, "name": tool_use.get("name")}]
+
+        if "result" in event:
+            return self.flush()
+
+        return []
+
+    def flush(self) -> list:
+        self.tool_use_id = None
+        text = self.thinking.flush()
+        return [{"type": "text", "agent": self.agent_name, "data": text}] if text else []
+
+def forward_stream(agent_name: str):
+    """
+    Callback handler of a sub-agent, forwards its partial output to the streaming caller of the request.
+    A pooled agent serves many requests: each invocation (init_event_loop) starts a new translator,
+    so a run that failed inside a <thinking> block does not mute the next one.
+    """
+    translator = StreamTranslator(agent_name)
+
+    def callback_handler(**kwargs):
+        nonlocal translator
+        if kwargs.get("init_event_loop"):
+            translator = StreamTranslator(agent_name)
+        for event in translator.translate(kwargs):
+            emit(event)
+
+    return callback_handler
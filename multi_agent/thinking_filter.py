@@ -0,0 +1,121 @@
+import re
+import time
+import random
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+THINKING_OPEN = "<thinking>"
+THINKING_CLOSE = "</thinking>"
+
+def partial_tag_length(text: str, tag: str, start: int = 0) -> int:
+    """
+    Length of the longest suffix of text[start:] that is a proper prefix of tag.
+    """
+    for size in range(min(len(tag) - 1, len(text) - start), 0, -1):
+        if text.endswith(tag[:size]):
+            return size
+    return 0
+
+class ThinkingFilter:
+    """
+    State machine dropping <thinking>...</thinking> blocks from text fed in chunks.
+    Every chunk is scanned once, only a possible partial tag at its end (at most
+    len(tag) - 1 characters) is held back, so tags split across chunks are recognized.
+    A block left open when the text ends is dropped.
+    """
+
+    def __init__(self, open_tag: str = THINKING_OPEN, close_tag: str = THINKING_CLOSE):
+        self.open_tag = open_tag
+        self.close_tag = close_tag
+        self.inside = False
+        self.pending = ""
+
+    def feed(self, chunk: str) -> str:
+        text = self.pending + chunk if self.pending else chunk
+        output = []
+        start = 0
+
+        while True:
+            tag = self.close_tag if self.inside else self.open_tag
+            index = text.find(tag, start)
+            if index < 0:
+                break
+            if not self.inside:
+                output.append(text[start:index])
+            start = index + len(tag)
+            self.inside = not self.inside
+
+        end = len(text) - partial_tag_length(text, tag, start)
+        if not self.inside:
+            output.append(text[start:end])
+        self.pending = text[end:]
+
+        return "".join(output)
+
+    def flush(self) -> str:
+        text = "" if self.inside else self.pending
+        self.inside = False
+        self.pending = ""
+        return text
+
+def strip_thinking(text: str) -> str:
+    """
+    Remove all <thinking>...</thinking> blocks from a finished response.
+    """
+    thinking_filter = ThinkingFilter()
+    return (thinking_filter.feed(text) + thinking_filter.flush()).strip()
+
+# Benchmark against the regex it replaces
+if __name__ == "__main__":
+    random.seed(42)
+    pattern = re.compile(r"<thinking>.*?</thinking>", flags=re.DOTALL)
+
+    def sample(size: int) -> str:
+        words = ["account", "ACC-302.250", "balance", "{\"status\": 200}", "\n", "card", "P-001"]
+        parts = []
+        while sum(len(p) for p in parts) < size:
+            if random.random() < 0.05:
+                parts.append(f"<thinking>{' '.join(random.choices(words, k=40))}</thinking>")
+            parts.append(random.choice(words) + " ")
+        return "".join(parts)
+
+    def chunked(text: str, size: int) -> list:
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    for size in [4_000, 32_000, 256_000]:
+        text = sample(size)
+        expected = pattern.sub("", text).strip()
+        runs = max(1, 2_000_000 // size)
+
+        started = time.perf_counter()
+        for _ in range(runs):
+            pattern.sub("", text).strip()
+        regex_us = (time.perf_counter() - started) / runs * 1e6
+
+        started = time.perf_counter()
+        for _ in range(runs):
+            result = strip_thinking(text)
+        filter_us = (time.perf_counter() - started) / runs * 1e6
+        assert result == expected
+
+        chunks = chunked(text, 16)
+        started = time.perf_counter()
+        for _ in range(runs):
+            thinking_filter = ThinkingFilter()
+            streamed = "".join(thinking_filter.feed(c) for c in chunks) + thinking_filter.flush()
+        stream_us = (time.perf_counter() - started) / runs * 1e6
+        assert streamed.strip() == expected
+
+        # the regex needs the whole text, on a stream it runs again over the growing buffer
+        started = time.perf_counter()
+        buffered = ""
+        for c in chunks[:2000]:
+            buffered += c
+            pattern.sub("", buffered)
+        rescan_us = (time.perf_counter() - started) / min(len(chunks), 2000) * len(chunks) * 1e6
+
+        print(f"{len(text):>8} chars | regex {regex_us:>10.1f}us | filter {filter_us:>10.1f}us"
+              f" | filter 16 char chunks {stream_us:>10.1f}us | regex rescan per chunk >={rescan_us:>12.1f}us")
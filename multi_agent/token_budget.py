@@ -0,0 +1,224 @@
+import os
+import json
+import logging
+
+from strands.agent.conversation_manager import ConversationManager
+from strands.hooks import BeforeModelCallEvent, HookRegistry
+from strands.types.exceptions import ContextWindowOverflowException
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONVERSATION_TOKEN_BUDGET = int(os.getenv("CONVERSATION_TOKEN_BUDGET", "6000"))
+CONVERSATION_DIGEST_TOKENS = int(os.getenv("CONVERSATION_DIGEST_TOKENS", "300"))
+CONVERSATION_SUMMARY_TOKENS = int(os.getenv("CONVERSATION_SUMMARY_TOKENS", "500"))
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+SUMMARY_PREFIX = "[Earlier in this conversation]"
+DIGEST_PREFIX = "[digest]"
+DIGEST_SAMPLE = 2
+
+def estimate_tokens(message: dict) -> int:
+    """
+    Rough token count of a message, about 4 characters per token.
+    """
+    chars = 0
+    for content in message.get("content", []):
+        if "text" in content:
+            chars += len(content["text"])
+        elif "toolUse" in content:
+            chars += len(json.dumps(content["toolUse"].get("input", {}), ensure_ascii=False)) + 32
+        elif "toolResult" in content:
+            for result in content["toolResult"].get("content", []):
+                chars += len(result["text"]) if "text" in result else len(json.dumps(result.get("json", result), ensure_ascii=False, default=str))
+        else:
+            chars += 256
+    return chars // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+
+def digest_payload(payload, depth: int = 0):
+    """
+    Compact structure of a payload: scalars kept, long lists reduced to their size, keys and a sample.
+    """
+    if isinstance(payload, list):
+        if len(payload) <= DIGEST_SAMPLE:
+            return [digest_payload(item, depth + 1) for item in payload]
+        digest = {"items": len(payload), "sample": [digest_payload(item, depth + 1) for item in payload[:DIGEST_SAMPLE]]}
+        if payload and isinstance(payload[0], dict):
+            digest["keys"] = sorted(payload[0].keys())
+        return digest
+    if isinstance(payload, dict):
+        if depth > 3:
+            return {"keys": sorted(payload.keys())}
+        return {k: digest_payload(v, depth + 1) for k, v in payload.items()}
+    if isinstance(payload, str) and len(payload) > 120:
+        return payload[:120] + "..."
+    return payload
+
+def digest_tool_result(result: dict, max_tokens: int) -> bool:
+    """
+    Replace a bulky toolResult content by a structured digest, returns whether it changed.
+    """
+    content = result.get("content", [])
+    size = estimate_tokens({"content": [{"toolResult": result}]})
+    if size <= max_tokens or any(c.get("text", "").startswith(DIGEST_PREFIX) for c in content):
+        return False
+
+    digests = []
+    for item in content:
+        # sub-agents answer with json blocks ({"results": [...]}), MCP tools with JSON text
+        payload = item.get("json")
+        if payload is None and "text" in item:
+            try:
+                payload = json.loads(item["text"])
+            except ValueError:
+                payload = None
+            # sessions stored before the structured results hold sub-agent answers as {"status", "response": "<json text>"}
+            if isinstance(payload, dict) and isinstance(payload.get("response"), str):
+                try:
+                    payload["response"] = json.loads(payload["response"])
+                except ValueError:
+                    pass
+        if payload is None:
+            text = item.get("text", "")
+            payload = text[:max_tokens * CHARS_PER_TOKEN] + f"... [{len(text)} chars]"
+        digests.append(digest_payload(payload))
+
+    digest = json.dumps(digests[0] if len(digests) == 1 else digests, ensure_ascii=False, default=str)
+    result["content"] = [{"text": f"{DIGEST_PREFIX} {digest[:max_tokens * CHARS_PER_TOKEN]}"}]
+    return True
+
+def is_turn_start(message: dict) -> bool:
+    """
+    A user message that is not a tool result, the only safe place to cut a conversation.
+    """
+    return message["role"] == "user" and not any("toolResult" in c for c in message["content"])
+
+def message_text(message: dict) -> str:
+    return " ".join(c["text"] for c in message["content"] if "text" in c and not c["text"].startswith(SUMMARY_PREFIX)).strip()
+
+class TokenBudgetConversationManager(ConversationManager):
+    """
+    Keeps the conversation under a token budget instead of a message count.
+    Bulky tool results of finished turns are replaced by structured digests first, then the
+    oldest turns are evicted and folded into a short summary merged in the first user message.
+    """
+
+    def __init__(self, token_budget: int = CONVERSATION_TOKEN_BUDGET,
+                 digest_tokens: int = CONVERSATION_DIGEST_TOKENS,
+                 summary_tokens: int = CONVERSATION_SUMMARY_TOKENS):
+        super().__init__()
+        self.token_budget = token_budget
+        self.digest_tokens = digest_tokens
+        self.summary_tokens = summary_tokens
+        self.summary = []
+        self._tokens = {}
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        super().register_hooks(registry, **kwargs)
+        # tool loops of one turn can grow past the budget, check before every model call
+        registry.add_callback(BeforeModelCallEvent, lambda event: self.apply_management(event.agent))
+
+    def get_state(self) -> dict:
+        return {**super().get_state(), "summary": self.summary}
+
+    def restore_from_session(self, state: dict):
+        """
+        State of another manager (a session written before the token budget) is ignored,
+        its messages are kept and trimmed to the budget on the next turn.
+        """
+        if state.get("__name__") != self.__class__.__name__:
+            logger.warning(f"Ignoring the state of conversation manager {state.get('__name__')}, keeping the messages")
+            return None
+
+        super().restore_from_session(state)
+        self.summary = state.get("summary", [])
+        return None
+
+    def _estimate(self, message: dict) -> int:
+        # cached by identity, digests replace the content list so they are recounted
+        key = id(message)
+        cached = self._tokens.get(key)
+        if cached is not None and cached[0] is message and cached[1] is message["content"]:
+            return cached[2]
+        tokens = estimate_tokens(message)
+        self._tokens[key] = (message, message["content"], tokens)
+        return tokens
+
+    def total_tokens(self, messages: list) -> int:
+        total = sum(self._estimate(m) for m in messages)
+        if len(self._tokens) > 2 * len(messages):
+            live = {id(m) for m in messages}
+            self._tokens = {k: v for k, v in self._tokens.items() if k in live}
+        return total
+
+    def apply_management(self, agent, **kwargs) -> None:
+        if self.total_tokens(agent.messages) > self.token_budget:
+            self.reduce_context(agent)
+        self._merge_summary(agent.messages)
+
+    def reduce_context(self, agent, e: Exception = None, **kwargs) -> None:
+        messages = agent.messages
+        turn_starts = [i for i, m in enumerate(messages) if is_turn_start(m)]
+
+        # a turn is running until the assistant answers without a tool call
+        finished = bool(messages) and messages[-1]["role"] == "assistant" \
+                        and not any("toolUse" in c for c in messages[-1]["content"])
+        current_turn = turn_starts[-1] if turn_starts else len(messages)
+
+        # 1. digest bulky tool results, the running turn needs them whole unless the model overflowed
+        last = len(messages) if finished or e is not None else current_turn
+        for index in range(last):
+            if self.total_tokens(messages) <= self.token_budget:
+                break
+            for content in messages[index]["content"]:
+                if "toolResult" in content and digest_tool_result(content["toolResult"], self.digest_tokens):
+                    messages[index]["content"] = list(messages[index]["content"])
+                    logger.info(f"Tool result {content['toolResult'].get('toolUseId')} digested")
+
+        # 2. evict the oldest turns until the rest fits, always keeping the current one
+        total = self.total_tokens(messages)
+        trim_index = 0
+        for start in turn_starts[1:]:
+            if total <= self.token_budget:
+                break
+            total -= sum(self._estimate(m) for m in messages[trim_index:start])
+            trim_index = start
+
+        if trim_index == 0:
+            if e is not None:
+                raise ContextWindowOverflowException("Unable to trim conversation context!") from e
+            return
+
+        self._summarize(messages[:trim_index])
+        self.removed_message_count += trim_index
+        del messages[:trim_index]
+        logger.info(f"Evicted {trim_index} messages, {self.total_tokens(messages)} estimated tokens left")
+        self._merge_summary(messages)
+
+    def _summarize(self, evicted: list) -> None:
+        """
+        Extractive summary of the evicted turns: each question and the final answer given.
+        """
+        for message in evicted:
+            text = message_text(message)
+            if not text or (message["role"] == "assistant" and any("toolUse" in c for c in message["content"])):
+                continue
+            self.summary.append(f"{message['role']}: {text[:300]}")
+
+        while self.summary and sum(len(line) for line in self.summary) // CHARS_PER_TOKEN > self.summary_tokens:
+            self.summary.pop(0)
+
+    def _merge_summary(self, messages: list) -> None:
+        """
+        Keep the summary as the first block of the first user message, models reject two user messages in a row.
+        """
+        if not self.summary or not messages or messages[0]["role"] != "user":
+            return
+
+        block = {"text": SUMMARY_PREFIX + "\n" + "\n".join(self.summary)}
+        content = [c for c in messages[0]["content"] if not c.get("text", "").startswith(SUMMARY_PREFIX)]
+        if messages[0]["content"] and messages[0]["content"][0] == block:
+            return
+        messages[0]["content"] = [block] + content
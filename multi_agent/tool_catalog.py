@@ -0,0 +1,280 @@
+import os
+import copy
+import json
+import time
+import uuid
+import logging
+import threading
+from datetime import timedelta
+
+import jsonschema
+
+from strands.types.tools import AgentTool
+from strands.types._events import ToolResultEvent
+from strands.tools.mcp.mcp_agent_tool import MCPAgentTool
+
+from request_context import get_token, credential_meta, record_usage
+from mcp_pool import MCP_URL, get_mcp_pool
+from result_cache import result_cache
+from circuit_breaker import CircuitOpenError
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MCP_TOOL_CATALOG_TTL = float(os.getenv("MCP_TOOL_CATALOG_TTL", "300"))
+
+class ToolArgumentError(ValueError):
+    """Arguments that do not match the MCP tool input schema."""
+    pass
+
+def agent_input_schema(schema: dict) -> dict:
+    """
+    Input schema as seen by callers: without the jwt argument, filled in from the request context.
+    """
+    schema = copy.deepcopy(schema or {})
+    schema.get("properties", {}).pop("jwt", None)
+    if "jwt" in schema.get("required", []):
+        schema["required"] = [name for name in schema["required"] if name != "jwt"]
+    return schema
+
+class MCPToolProxy(AgentTool):
+    """
+    Agent facing wrapper of an MCP tool.
+    The credential comes from the request context: the jwt argument is hidden from the LLM and
+    filled in at call time, and the token is also sent in the MCP request _meta.
+    Idempotent reads are served from the result cache, writes invalidate the cached reads.
+    Calls go through the circuit breaker of the MCP endpoint, an open circuit answers with an error at once.
+    """
+
+    def __init__(self, mcp_tool: MCPAgentTool, breaker):
+        super().__init__()
+        self.mcp_tool = mcp_tool
+        self.breaker = breaker
+        self._tool_spec = None
+
+    @property
+    def tool_name(self) -> str:
+        return self.mcp_tool.tool_name
+
+    @property
+    def tool_spec(self):
+        if self._tool_spec is None:
+            spec = copy.deepcopy(self.mcp_tool.tool_spec)
+            spec["inputSchema"]["json"] = agent_input_schema(spec["inputSchema"]["json"])
+            self._tool_spec = spec
+        return self._tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return self.mcp_tool.tool_type
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        token = get_token()
+        arguments = dict(tool_use.get("input") or {})
+        if token and "jwt" in (self.mcp_tool.mcp_tool.inputSchema or {}).get("properties", {}):
+            arguments["jwt"] = token
+
+        cached, generation = result_cache.lookup(self.tool_name, arguments, token)
+        if cached is not None:
+            record_usage(mcp_cache_hits=1)
+            yield ToolResultEvent({**cached, "toolUseId": tool_use["toolUseId"]})
+            return
+
+        try:
+            self.breaker.allow()
+        except CircuitOpenError as e:
+            yield ToolResultEvent({"toolUseId": tool_use["toolUseId"], "status": "error", "content": [{"text": str(e)}]})
+            return
+
+        record_usage(mcp_calls=1)
+        result = await self.mcp_tool.mcp_client.call_tool_async(
+            tool_use_id=tool_use["toolUseId"],
+            name=self.mcp_tool.mcp_tool.name,
+            arguments=arguments,
+            read_timeout_seconds=self.mcp_tool.timeout,
+            meta=credential_meta(token),
+            cancel_signal=getattr(invocation_state.get("agent"), "_cancel_signal", None),
+        )
+        record_call(self.breaker, result)
+
+        result_cache.record(self.tool_name, arguments, token, result, generation)
+        yield ToolResultEvent(result)
+
+class ToolCatalog:
+    """
+    Cached tools/list result of one MCP endpoint.
+    Refreshed when the TTL expires or the server sends notifications/tools/list_changed.
+    """
+
+    def __init__(self, mcp_pool, ttl: float = MCP_TOOL_CATALOG_TTL):
+        self.mcp_pool = mcp_pool
+        self.ttl = ttl
+        self._mcp_tools = {}
+        self._fetched_at = 0.0
+        self._subsets = {}
+        self.version = 0
+        self._lock = threading.Lock()
+
+        # must be registered before the sessions start to receive list_changed
+        for conn in mcp_pool.connections:
+            conn.client.on_tools_changed = self._on_tools_changed
+
+    def _store(self, tools) -> None:
+        mcp_tools = {t.mcp_tool.name: t.mcp_tool for t in tools}
+
+        with self._lock:
+            self._fetched_at = time.time()
+            if mcp_tools == self._mcp_tools:
+                return
+
+            self._mcp_tools = mcp_tools
+            self._subsets.clear()
+            self.version += 1
+
+        logger.info(f"Tool catalog {self.mcp_pool.mcp_url} v{self.version}: {list(mcp_tools)}")
+
+    def _on_tools_changed(self, previous_names, refreshed_tools, **kwargs) -> None:
+        logger.info(f"tools/list_changed received from {self.mcp_pool.mcp_url}")
+        self._store(refreshed_tools)
+
+    def refresh(self, client) -> None:
+        self._store(client.list_tools_sync())
+
+    def prefetch(self) -> None:
+        """
+        Warm the catalog at startup. An unreachable MCP server does not stop the caller,
+        the catalog is then loaded on first use (ensure_fresh).
+        """
+        try:
+            with self.mcp_pool.connection() as client:
+                self.refresh(client)
+        except Exception as e:
+            logger.error(f"Failed to prefetch the tool catalog of {self.mcp_pool.mcp_url}, loading it on first use. Reason: {e}")
+
+    def ensure_fresh(self, client) -> None:
+        if time.time() - self._fetched_at > self.ttl:
+            self.refresh(client)
+
+    def select(self, client, tool_names: list) -> list:
+        """
+        Return the tools named in tool_names bound to the borrowed client.
+        Subsets are built once per (client, tool_names) and reused until the catalog changes.
+        """
+        self.ensure_fresh(client)
+
+        key = (client, tuple(tool_names))
+        with self._lock:
+            tools = self._subsets.get(key)
+            if tools is None:
+                # drop the subsets bound to replaced sessions
+                clients = {conn.client for conn in self.mcp_pool.connections}
+                for stale in [k for k in self._subsets if k[0] not in clients]:
+                    del self._subsets[stale]
+                tools = [MCPToolProxy(MCPAgentTool(self._mcp_tools[name], client), self.mcp_pool.breaker)
+                            for name in tool_names if name in self._mcp_tools]
+                self._subsets[key] = tools
+
+        return tools
+
+    def input_properties(self, name: str) -> dict:
+        mcp_tool = self._mcp_tools.get(name)
+        if mcp_tool is None:
+            return {}
+        return (mcp_tool.inputSchema or {}).get("properties", {})
+
+    def validate_arguments(self, name: str, arguments: dict) -> None:
+        """
+        Check arguments against the MCP tool input schema, raises ToolArgumentError.
+        """
+        if name not in self._mcp_tools:
+            with self.mcp_pool.connection() as client:
+                self.ensure_fresh(client)
+
+        mcp_tool = self._mcp_tools.get(name)
+        if mcp_tool is None:
+            raise ToolArgumentError(f"Unknown MCP tool {name}")
+
+        schema = agent_input_schema(mcp_tool.inputSchema)
+        errors = sorted(jsonschema.validators.validator_for(schema)(schema).iter_errors(arguments or {}), key=str)
+        if errors:
+            raise ToolArgumentError("; ".join(f"{'.'.join(map(str, e.path)) or name}: {e.message}" for e in errors))
+
+    def call_tool(self, name: str, arguments: dict, token: str = None, timeout: float = None) -> dict:
+        """
+        Call an MCP tool directly, without an agent in between, through the result cache.
+        The token defaults to the request context one, the jwt argument is only sent to tools whose input schema declares it.
+        """
+        token = token or get_token()
+
+        cached, generation = result_cache.lookup(name, arguments, token)
+        if cached is not None:
+            record_usage(mcp_cache_hits=1)
+            return cached
+
+        record_usage(mcp_calls=1)
+        result = self._call_tool(name, arguments, token, timeout)
+        result_cache.record(name, arguments, token, result, generation)
+        return result
+
+    def _call_tool(self, name: str, arguments: dict, token: str, timeout: float) -> dict:
+        with self.mcp_pool.connection() as client:
+            self.ensure_fresh(client)
+
+            arguments = dict(arguments)
+            if token and "jwt" in self.input_properties(name):
+                arguments["jwt"] = token
+
+            logger.info(f"Direct MCP call: {name} {list(arguments)}")
+            self.mcp_pool.breaker.allow()
+            result = client.call_tool_sync(tool_use_id=f"direct-{uuid.uuid4().hex}",
+                                           name=name,
+                                           arguments=arguments,
+                                           meta=credential_meta(token),
+                                           read_timeout_seconds=timedelta(seconds=timeout) if timeout else None)
+            return record_call(self.mcp_pool.breaker, result)
+
+def is_transport_failure(result: dict) -> bool:
+    """
+    Transport failures (connection, timeout) come back from MCPClient as error results with this prefix,
+    errors answered by the server tool itself (e.g. not found) do not have it.
+    """
+    return result.get("status") == "error" and any(
+        c.get("text", "").startswith("Tool execution failed:") for c in result.get("content", []))
+
+def record_call(breaker, result: dict) -> dict:
+    """
+    Count an MCP call against the endpoint circuit, errors answered by the server tool mean the endpoint is up.
+    """
+    if is_transport_failure(result):
+        breaker.failure()
+    else:
+        breaker.success()
+    return result
+
+def tool_result_payload(result: dict):
+    """
+    Extract the MCP payload from a tool result, JSON decoded when possible.
+    """
+    if result.get("structuredContent") is not None:
+        return result["structuredContent"]
+
+    payloads = [c["json"] for c in result.get("content", []) if "json" in c]
+    if payloads:
+        return payloads[0] if len(payloads) == 1 else payloads
+
+    text = "".join(c.get("text", "") for c in result.get("content", []))
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+# global catalogs, one per mcp endpoint
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+def get_tool_catalog(mcp_url: str = MCP_URL) -> ToolCatalog:
+    with _catalogs_lock:
+        if mcp_url not in _catalogs:
+            _catalogs[mcp_url] = ToolCatalog(get_mcp_pool(mcp_url))
+        return _catalogs[mcp_url]
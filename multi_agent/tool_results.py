@@ -0,0 +1,76 @@
+import logging
+
+from tool_catalog import tool_result_payload
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def compact(payload):
+    """
+    Drop null and empty values, they only cost tokens.
+    """
+    if isinstance(payload, dict):
+        payload = {k: compact(v) for k, v in payload.items()}
+        return {k: v for k, v in payload.items() if v not in (None, "", [], {})}
+    if isinstance(payload, list):
+        return [compact(item) for item in payload]
+    return payload
+
+def project(payload, fields: list = None):
+    """
+    Keep only the given fields of a payload (dicts, lists of dicts, or wrappers of them), compacted.
+    """
+    if not fields:
+        return compact(payload)
+
+    if isinstance(payload, list):
+        return [project(item, fields) for item in payload]
+
+    if isinstance(payload, dict):
+        projected = {k: payload[k] for k in fields if k in payload}
+        if projected:
+            return compact(projected)
+        # a wrapper like {"account": {...}} or {"moviments": [...]}, project what it holds
+        return {k: project(v, fields) for k, v in payload.items() if isinstance(v, (dict, list))}
+
+    return payload
+
+def mcp_payloads(messages: list, tool_names: list = None) -> list:
+    """
+    MCP calls of a finished sub-agent run with their original payloads, read from its messages.
+    """
+    tool_uses = {}
+    results = []
+    for message in messages:
+        for content in message["content"]:
+            if "toolUse" in content:
+                tool_uses[content["toolUse"]["toolUseId"]] = content["toolUse"]
+            elif "toolResult" in content:
+                result = content["toolResult"]
+                tool_use = tool_uses.get(result.get("toolUseId"), {})
+                if tool_names is not None and tool_use.get("name") not in tool_names:
+                    continue
+                results.append({
+                    "tool": tool_use.get("name"),
+                    "arguments": {k: v for k, v in (tool_use.get("input") or {}).items() if k != "jwt"},
+                    "status": result.get("status"),
+                    "data": tool_result_payload(result),
+                })
+    return results
+
+def structured_result(results: list, fields: list = None) -> dict:
+    """
+    Tool result handed to the orchestrator: the MCP payloads as a json block, no prose re-rendition.
+    """
+    for result in results:
+        result["data"] = project(result["data"], fields)
+
+    failed = [r for r in results if r["status"] != "success"]
+    return {
+        "status": "error" if results and len(failed) == len(results) else "success",
+        "content": [{"json": {"results": results}}],
+    }
+
+def text_result(text: str, status: str = "success") -> dict:
+    return {"status": status, "content": [{"text": text}]}
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the agent modules import each other by bare name, as when run from multi_agent/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "multi_agent"))
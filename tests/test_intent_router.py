@@ -0,0 +1,124 @@
+import pytest
+
+from corpus import load_corpus
+from intent_router import parse_intent, query_tier
+
+ALL_SERVICES = ["ACCOUNT", "LEDGER", "CARD", "PAYMENT"]
+
+# README sample query -> (intent name, MCP calls or health services, model tier); None goes to the orchestrator
+EXPECTED = {
+    # HEALTH
+    "check the current health status of ACCOUNT services and show the result":
+        ("health", ["ACCOUNT"], "lite"),
+    "check the current health status of LEDGER services and show the result":
+        ("health", ["LEDGER"], "lite"),
+    "check the current health status of CARD and ACCOUNT services and show the result":
+        ("health", ["ACCOUNT", "CARD"], "lite"),
+    "check the current health status of all services avaiable and show the result":
+        ("health", ALL_SERVICES, "lite"),
+    # ACCOUNT
+    "create an account with id ACC-302.201 and a person P-302.201":
+        ("create_account", [("create_account", {"account": "ACC-302.201", "person": "P-302.201"})], "pro"),
+    "create 3 accounts with id from ACC-800.107 and a from person P-800.107 respectively":
+        (None, None, "premier"),
+    "create 3 accounts with id from ACC-800.110 but all of then must belongs for same person P-800.110":
+        (None, None, "premier"),
+    "show me the details of account ACC-302.250":
+        ("get_account", [("get_account", {"account": "ACC-302.250"})], "lite"),
+    "show me the current details of account ACC-4.000.002":
+        ("get_account", [("get_account", {"account": "ACC-4.000.002"})], "lite"),
+    "get all details of account ACC-4.000.003 and ACC-4.000.004":
+        ("batch", [("get_account", {"account": "ACC-4.000.003"}), ("get_account", {"account": "ACC-4.000.004"})], "default"),
+    "show me the infos of account ACC-200, ACC-201":
+        ("batch", [("get_account", {"account": "ACC-200"}), ("get_account", {"account": "ACC-201"})], "default"),
+    # ACCOUNT-PERSON
+    "show me the P-750 person's account":
+        ("get_account_from_person", [("get_account_from_person", {"person": "P-750"})], "lite"),
+    "show me the current accounts of person P-751":
+        ("get_account_from_person", [("get_account_from_person", {"person": "P-751"})], "lite"),
+    "which are the accounts from person P-500":
+        ("get_account_from_person", [("get_account_from_person", {"person": "P-500"})], "lite"),
+    "show me all accounts of person P-721 and P-722":
+        ("batch", [("get_account_from_person", {"person": "P-721"}),
+                   ("get_account_from_person", {"person": "P-722"})], "default"),
+    "check the current the accounts belongs to a person P-723":
+        ("get_account_from_person", [("get_account_from_person", {"person": "P-723"})], "lite"),
+    # LEDGER
+    "make a transaction type DEPOSIT, amount 2000 currency BRL over account ACC-301.002":
+        (None, None, "premier"),
+    "make a DEPOSIT, amount BRL 900.00 over account ACC-302.201":
+        (None, None, "premier"),
+    "show me the bank statement of account ACC-302.201":
+        ("get_account_statement", [("get_account_statement", {"account": "ACC-302.201"})], "lite"),
+    "show me all financial statements account ACC-4.000.000":
+        ("get_account_statement", [("get_account_statement", {"account": "ACC-4.000.000"})], "lite"),
+    "which are the account activity of account ACC-4.000.003":
+        ("get_account_statement", [("get_account_statement", {"account": "ACC-4.000.003"})], "lite"),
+    "show me the detailed balance summary of account ACC-4.000.003":
+        ("get_account_statement", [("get_account_statement", {"account": "ACC-4.000.003"})], "lite"),
+    # CARD
+    "show me the data of card 111.004.000.004":
+        ("get_card", [("get_card", {"card": "111.004.000.004"})], "lite"),
+    "get all details of card 111.111.004.002":
+        ("get_card", [("get_card", {"card": "111.111.004.002"})], "lite"),
+    "get all details of cards 111.111.004.000 and 111.111.004.004":
+        ("batch", [("get_card", {"card": "111.111.004.000"}), ("get_card", {"card": "111.111.004.004"})], "default"),
+    "create a card number 333.000.302.201 type DEBIT model CHIP holder eliezer-jr and associated with an account ACC-302.201":
+        (None, None, "pro"),
+    # PLAYBOOK
+    "create an account with id ACC-300.100 and a person P-300.100 and after create a card number 333.000.300.000 "
+    "type DEBIT model CHIP holder eliezer and associated with an account ACC-300.100":
+        (None, None, "premier"),
+    "create an account with id ACC-300.101 and a person P-300.101 and after create 3 cards number from 333.000.300.101 , "
+    "all cards type DEBIT model CHIP holder juliana and associated with an account ACC-300.101":
+        (None, None, "premier"),
+    # PAYMENT
+    "show me the payments of card 111.004.000.000 after 2025-09-21":
+        ("get_card_payment", [("get_card_payment", {"card": "111.004.000.000", "date": "2025-09-21"})], "lite"),
+    "show me the payments of card 111.004.000.004 after 2025-09-21":
+        ("get_card_payment", [("get_card_payment", {"card": "111.004.000.004", "date": "2025-09-21"})], "lite"),
+    "make a payment over a card 111.004.000.004 CREDIT, terminal TERM-2, for a GAS with amount amount BRL 310.00":
+        (None, None, "premier"),
+}
+
+CORPUS = load_corpus()
+
+def test_corpus_is_covered():
+    queries = [query for _, query in CORPUS]
+    missing = [q for q in queries if q not in EXPECTED and not q.startswith("store the info")]
+    assert not missing, f"README sample queries without an expectation: {missing}"
+    assert not set(EXPECTED) - set(queries), "expectations for queries no longer in the README"
+
+@pytest.mark.parametrize("query", list(EXPECTED))
+def test_intent(query):
+    name, calls, _ = EXPECTED[query]
+    intent = parse_intent(query)
+    if name is None:
+        assert intent is None
+        return
+
+    assert intent is not None
+    assert intent.name == name
+    if name == "health":
+        assert intent.services == calls
+        assert intent.calls == []
+    else:
+        assert intent.calls == calls
+
+@pytest.mark.parametrize("query", list(EXPECTED))
+def test_query_tier(query):
+    assert query_tier(query, "default") == EXPECTED[query][2]
+
+@pytest.mark.parametrize("query", [q for _, q in CORPUS if q.startswith("store the info")])
+def test_memory_requests_go_to_the_orchestrator(query):
+    assert parse_intent(query) is None
+    assert query_tier(query, "default") == "premier"
+
+@pytest.mark.parametrize("query", [
+    "show me the payments of card 111.004.000.000",
+    "show me something",
+    "create an account ACC-1.000",
+    "check the current health status of the database",
+])
+def test_incomplete_requests_go_to_the_orchestrator(query):
+    assert parse_intent(query) is None
@@ -0,0 +1,27 @@
+from strands import Agent
+
+import model_registry
+from fake_model import FakeModel
+from session_store import SessionStore, HeldRepositorySessionManager
+from model_registry import invoke_with_escalation
+
+def session_agent(store: SessionStore) -> Agent:
+    return Agent(model=FakeModel(latency=0, token_latency=0), callback_handler=None,
+                 session_manager=HeldRepositorySessionManager(session_id="tiers", session_repository=store))
+
+def test_escalated_attempt_is_not_persisted(monkeypatch):
+    monkeypatch.setattr(model_registry.model_registry, "get", lambda tier: FakeModel(latency=0, token_latency=0))
+    store = SessionStore()
+    agent = session_agent(store)
+    tiers = []
+
+    def is_confident(result, messages) -> bool:
+        tiers.append(agent.model)
+        return len(tiers) > 1
+
+    invoke_with_escalation(agent, "hello", "lite", is_confident=is_confident)
+
+    restored = session_agent(store)
+    assert len(tiers) == 2
+    assert [m["role"] for m in restored.messages] == ["user", "assistant"]
+    assert [m["content"] for m in restored.messages] == [m["content"] for m in agent.messages]
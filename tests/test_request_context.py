@@ -0,0 +1,32 @@
+import time
+
+import jwt
+import pytest
+
+import request_context
+from request_context import token_owner, token_fingerprint
+
+KEY = "test-signing-key-of-at-least-32-bytes"
+
+def signed(claims: dict, key: str = KEY) -> str:
+    return jwt.encode({"exp": int(time.time()) + 600, **claims}, key, algorithm="HS256")
+
+@pytest.fixture
+def verify_key(monkeypatch):
+    monkeypatch.setattr(request_context, "JWT_VERIFY_KEY", KEY)
+    monkeypatch.setattr(request_context, "JWT_ALGORITHMS", ["HS256"])
+
+def test_owner_survives_a_token_refresh(verify_key):
+    first = signed({"sub": "u1", "tenant_id": "t1", "iat": 1})
+    refreshed = signed({"sub": "u1", "tenant_id": "t1", "iat": 2})
+
+    assert token_owner(first) == token_owner(refreshed) == "t1/u1"
+
+def test_forged_token_is_rejected(verify_key):
+    with pytest.raises(jwt.InvalidTokenError):
+        token_owner(signed({"sub": "u1", "tenant_id": "t1"}, key="another-key-of-at-least-32-bytes!!"))
+
+def test_unverified_owner_is_the_exact_token():
+    token = signed({"sub": "u1"})
+
+    assert token_owner(token) == token_fingerprint(token)
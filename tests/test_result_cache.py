@@ -0,0 +1,49 @@
+from result_cache import ResultCache
+
+SUCCESS = {"status": "success", "content": [{"json": {"account_id": "ACC-1", "balance": 100}}]}
+
+def test_read_is_cached():
+    cache = ResultCache()
+
+    cached, generation = cache.lookup("get_account", {"account": "ACC-1"}, "token")
+    cache.record("get_account", {"account": "ACC-1"}, "token", SUCCESS, generation)
+
+    assert cached is None
+    assert cache.lookup("get_account", {"account": "ACC-1"}, "token")[0] == SUCCESS
+
+def test_write_invalidates_cached_read():
+    cache = ResultCache()
+    _, generation = cache.lookup("get_account", {"account": "ACC-1"}, "token")
+    cache.record("get_account", {"account": "ACC-1"}, "token", SUCCESS, generation)
+
+    cache.record("create_account", {"account": "ACC-1", "person": "P-1"}, "other token", SUCCESS)
+
+    assert cache.lookup("get_account", {"account": "ACC-1"}, "token")[0] is None
+
+def test_read_in_flight_during_a_write_is_not_stored():
+    cache = ResultCache()
+
+    _, generation = cache.lookup("get_account", {"account": "ACC-1"}, "token")
+    cache.record("create_account", {"account": "ACC-1", "person": "P-1"}, "token", SUCCESS)
+    cache.record("get_account", {"account": "ACC-1"}, "token", SUCCESS, generation)
+
+    assert cache.lookup("get_account", {"account": "ACC-1"}, "token")[0] is None
+
+def test_write_on_another_account_keeps_the_read():
+    cache = ResultCache()
+
+    _, generation = cache.lookup("get_account", {"account": "ACC-1"}, "token")
+    cache.record("create_account", {"account": "ACC-2", "person": "P-2"}, "token", SUCCESS)
+    cache.record("get_account", {"account": "ACC-1"}, "token", SUCCESS, generation)
+
+    assert cache.lookup("get_account", {"account": "ACC-1"}, "token")[0] == SUCCESS
+
+def test_forgotten_generations_do_not_let_a_stale_read_in():
+    cache = ResultCache(max_size=1)
+
+    _, generation = cache.lookup("get_account", {"account": "ACC-1"}, "token")
+    for i in range(10):
+        cache.record("create_account", {"account": f"ACC-{i}", "person": "P"}, "token", SUCCESS)
+    cache.record("get_account", {"account": "ACC-1"}, "token", SUCCESS, generation)
+
+    assert cache.lookup("get_account", {"account": "ACC-1"}, "token")[0] is None
@@ -0,0 +1,49 @@
+import pytest
+from strands.types.session import Session, SessionAgent, SessionMessage, SessionType
+
+from session_store import SessionStore, LogBackend
+
+class FlakyBackend:
+    """
+    Backend whose next `failures` writes raise, like a full disk or a locked database.
+    """
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.records = {}
+
+    def load(self, session_id: str):
+        return None
+
+    def append(self, session_id: str, records: list) -> None:
+        if self.failures > 0:
+            self.failures -= 1
+            raise OSError("No space left on device")
+        self.records.setdefault(session_id, []).extend(records)
+
+    rewrite = append
+
+    def delete(self, session_id: str) -> None:
+        self.records.pop(session_id, None)
+
+def test_session_id_can_not_leave_the_storage_dir(tmp_path):
+    store = SessionStore(LogBackend(str(tmp_path)), flush_interval=3600)
+
+    for session_id in ("../escape", "a/b", ".."):
+        with pytest.raises(ValueError):
+            store.create_session(Session(session_id=session_id, session_type=SessionType.AGENT))
+        with pytest.raises(ValueError):
+            LogBackend(str(tmp_path)).load(session_id)
+
+def test_failed_flush_keeps_the_records():
+    backend = FlakyBackend(failures=1)
+    store = SessionStore(backend, flush_interval=3600)
+    store.create_session(Session(session_id="s1", session_type=SessionType.AGENT))
+    store.create_agent("s1", SessionAgent(agent_id="main", state={}, conversation_manager_state={}))
+
+    with pytest.raises(OSError):
+        store.flush()
+    store.create_message("s1", "main", SessionMessage.from_message({"role": "user", "content": [{"text": "hi"}]}, 0))
+    store.flush()
+
+    assert [r["type"] for r in backend.records["s1"]] == ["session", "agent", "message"]
@@ -0,0 +1,15 @@
+from stream_events import forward_stream
+
+def test_failed_run_inside_thinking_does_not_mute_the_next(monkeypatch):
+    events = []
+    monkeypatch.setattr("stream_events.emit", events.append)
+    handler = forward_stream("account")
+
+    # the run fails before </thinking>
+    handler(init_event_loop=True)
+    handler(data="<thinking>looking up the account")
+
+    handler(init_event_loop=True)
+    handler(data="ACC-1: 100.00")
+
+    assert [e["data"] for e in events if e["type"] == "text"] == ["ACC-1: 100.00"]
@@ -0,0 +1,30 @@
+from strands import Agent
+from strands.agent.conversation_manager import SlidingWindowConversationManager
+from strands.session.repository_session_manager import RepositorySessionManager
+
+from fake_model import FakeModel
+from session_store import SessionStore
+from token_budget import TokenBudgetConversationManager
+
+def session_agent(store: SessionStore, conversation_manager) -> tuple:
+    session_manager = RepositorySessionManager(session_id="budget", session_repository=store)
+    agent = Agent(model=FakeModel(),
+                  conversation_manager=conversation_manager,
+                  session_manager=session_manager,
+                  callback_handler=None)
+    return agent, session_manager
+
+def test_restores_a_sliding_window_session():
+    store = SessionStore()
+    messages = [{"role": "user", "content": [{"text": "balance of account 1001"}]},
+                {"role": "assistant", "content": [{"text": "1001: 250.00 USD"}]}]
+    agent, session_manager = session_agent(store, SlidingWindowConversationManager())
+    for message in messages:
+        agent.messages.append(message)
+        session_manager.append_message(message, agent)
+    session_manager.sync_agent(agent)
+
+    restored, _ = session_agent(store, TokenBudgetConversationManager())
+
+    assert [m["content"] for m in restored.messages] == [m["content"] for m in messages]
+    assert restored.conversation_manager.summary == []